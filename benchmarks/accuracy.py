@@ -0,0 +1,138 @@
+# benchmarks/accuracy.py
+"""
+Runtime and accuracy of reduced models. Each variant (a set of user_config options) is generated
+and simulated next to the reference model for buildings of several heights. Its model size,
+simulation time and annual electricity and gas use are compared with the reference.
+
+Simulations go through runner_generator.run_simulation with the configured SIMULATOR and the
+simulation cache disabled, reporting hourly with the energy-summary output profile. "sim s" is
+the whole run_simulation call, which includes eppy writing the IDF out again; "E+ s" is the
+elapsed time EnergyPlus reports in its .err file, and the speedup is taken from it when there
+is one. Runtime and deviation figures need EnergyPlus; with SIMULATOR=fake this only checks
+the harness.
+
+Run from the repository root:
+    python -m benchmarks.accuracy --variants zone-multipliers fast detailed --heights 15 30 60
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+
+from geomeppy import IDF
+
+from benchmarks.generation import REPO_ROOT, find_idd, synthetic_buildings
+from config import get_idf_config
+from config_manager import ConfigurationManager, preprocess_building_data
+from configuration_setup import get_configuration
+from generation_engine import process_building
+from json_processor import read_building_output
+from runner_generator import run_simulation
+
+# user_config options of each variant; the reference model uses none of them (standard fidelity)
+VARIANTS = {
+    "zone-multipliers": {"zone_multipliers": True},
+    "fast": {"fidelity": "fast"},
+    "detailed": {"fidelity": "detailed"},
+}
+
+OUTPUT_OPTIONS = {"reporting_frequency": "hourly", "output_profile": "energy-summary"}
+
+
+def model_size(idf_path):
+    idf = IDF(idf_path)
+    return len(idf.idfobjects['ZONE']), sum(len(objects) for objects in idf.idfobjects.values())
+
+
+def energyplus_seconds(idf_path):
+    """Elapsed time from the EnergyPlus .err file next to idf_path, or None."""
+    try:
+        with open(os.path.splitext(idf_path)[0] + ".err", errors="replace") as f:
+            match = re.search(r"Elapsed Time=(\d+)hr\s+(\d+)min\s+([\d.]+)sec", f.read())
+    except OSError:
+        return None
+    if match is None:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def annual_totals(output_path, building_id):
+    """Annual (electricity, natural gas) in J, or None without results."""
+    output = read_building_output(output_path, building_id, {}, None, OUTPUT_OPTIONS['reporting_frequency'])
+    if output is None:
+        return None
+    record = output[1]
+    return sum(record['Electricity Consumption (J)']), sum(record['Natural Gas Consumption (J)'])
+
+
+def run_model(row, options, work_dir, data_structure, config_checksum, base_idf_path, idd_path, epwfile):
+    """Generate and simulate one building with the given user_config options."""
+    config_manager = ConfigurationManager(data_structure, {"seed": 0, **OUTPUT_OPTIONS, **options}, config_checksum=config_checksum)
+    os.makedirs(work_dir, exist_ok=True)
+    start = time.perf_counter()
+    idf_path = process_building(row, base_idf_path, idd_path, work_dir, config_manager)
+    generate_seconds = time.perf_counter() - start
+    zones, objects = model_size(idf_path)
+
+    result = run_simulation((idf_path, epwfile, idd_path, OUTPUT_OPTIONS))
+    if result['status'] != 'success':
+        return {"zones": zones, "objects": objects, "generate": generate_seconds, "error": result['error']}
+    return {"zones": zones, "objects": objects, "generate": generate_seconds, "simulate": result['seconds'],
+            "energyplus": energyplus_seconds(idf_path),
+            "totals": annual_totals(result['output_path'], row['nummeraanduiding_id']), "error": None}
+
+
+def deviation(value, reference):
+    return f"{(value - reference) / reference:+8.2%}" if reference else f"{'n/a':>8}"
+
+
+def print_row(name, model, reference):
+    if model['error']:
+        print(f"   {name:<18} {model['zones']:>6} {model['objects']:>8} {model['generate']:>7.2f}   failed: {model['error']}")
+        return
+    runtime = 'energyplus' if model['energyplus'] and reference.get('energyplus') else 'simulate'
+    speedup = reference[runtime] / model[runtime] if reference.get(runtime) else float('nan')
+    energyplus = f"{model['energyplus']:>8.1f}" if model['energyplus'] else f"{'n/a':>8}"
+    electricity = gas = f"{'n/a':>8}"
+    if model['totals'] and reference.get('totals'):
+        electricity = deviation(model['totals'][0], reference['totals'][0])
+        gas = deviation(model['totals'][1], reference['totals'][1])
+    print(f"   {name:<18} {model['zones']:>6} {model['objects']:>8} {model['generate']:>7.2f} {model['simulate']:>8.2f} "
+          f"{energyplus} {speedup:>7.1f}x {electricity} {gas}")
+
+
+def run(variants, heights, idd_path):
+    os.environ["SIM_CACHE_ENABLED"] = "false"
+    base_idf_path = os.path.join(REPO_ROOT, "data", "Minimal.idf")
+    idd_path = find_idd(idd_path)
+    epwfile = get_idf_config()['epwfile']
+    if not os.path.exists(epwfile):
+        epwfile = os.path.join(REPO_ROOT, "data", "NLD_Amsterdam.062400_IWEC.epw")
+    print(f"Simulator {os.getenv('SIMULATOR', 'energyplus')}, weather {os.path.basename(epwfile)}\n")
+
+    data_structure, config_checksum = get_configuration()
+    reference_config = ConfigurationManager(data_structure, {"seed": 0}, config_checksum=config_checksum)
+    building = synthetic_buildings(1, data_structure)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for height in heights:
+            row = preprocess_building_data(building.assign(height=float(height)), reference_config).to_dict('records')[0]
+            print(f"== {height} m ({int(height / 3)} storeys)")
+            print(f"   {'model':<18} {'zones':>6} {'objects':>8} {'gen s':>7} {'sim s':>8} {'E+ s':>8} {'speedup':>8} {'elec':>8} {'gas':>8}")
+            models = {}
+            for name, options in [("reference", {})] + [(variant, VARIANTS[variant]) for variant in variants]:
+                models[name] = run_model(row, options, os.path.join(work_dir, f"{height}", name), data_structure, config_checksum,
+                                         base_idf_path, idd_path, epwfile)
+                print_row(name, models[name], models["reference"])
+            print()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=list(VARIANTS), help="variants to compare with the reference")
+    parser.add_argument("--heights", type=float, nargs="+", default=[15, 30, 60], help="building heights in m (3 m storeys)")
+    parser.add_argument("--idd", default=None, help="Energy+.idd to use instead of IDDFILE or the bundled fixture")
+    args = parser.parse_args()
+    run(args.variants, args.heights, args.idd)
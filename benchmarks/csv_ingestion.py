@@ -0,0 +1,90 @@
+# benchmarks/csv_ingestion.py
+"""
+Compare EnergyPlus CSV ingestion throughput of a bare pd.read_csv with the typed column reader.
+
+A synthetic EnergyPlus-style CSV (Date/Time, the three energy columns and filler meters) is
+written once and hard-linked into a batch of files, then both readers ingest the whole batch.
+
+Run from the repository root:
+    python -m benchmarks.csv_ingestion --files 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from json_processor import energy_columns, read_building_output
+
+ELECTRICITY_COLUMN, GAS_COLUMNS = energy_columns("timestep")
+ENERGY_COLUMNS = [ELECTRICITY_COLUMN] + GAS_COLUMNS
+
+
+def write_synthetic_csv(path, rows, extra_columns):
+    rng = np.random.default_rng(0)
+    # EnergyPlus writes " MM/DD  HH:MM:SS" timestamps
+    minutes = np.arange(1, rows + 1) * (525600 // rows)
+    timestamps = pd.Timestamp("2023-01-01") + pd.to_timedelta(minutes, unit="m")
+    columns = {"Date/Time": [f" {t:%m/%d}  {t:%H:%M:%S}" for t in timestamps]}
+    for column in ENERGY_COLUMNS:
+        columns[column] = rng.uniform(0, 5e6, rows)
+    for i in range(extra_columns):
+        columns[f"ZONE {i}:Zone Mean Air Temperature [C](TimeStep)"] = rng.uniform(15, 25, rows)
+    pd.DataFrame(columns).to_csv(path, index=False)
+
+
+def read_bare(file_path, building_id, building_info):
+    # The reader before typed ingestion: every column parsed, dtypes inferred, Date/Time every time
+    df = pd.read_csv(file_path)
+    gas = df.get(ENERGY_COLUMNS[1], 0) + df.get(ENERGY_COLUMNS[2], 0)
+    total = df[ENERGY_COLUMNS[0]] + gas
+    return df['Date/Time'].tolist(), {
+        'buildingId': building_id,
+        'Natural Gas Consumption (J)': gas.tolist(),
+        'Electricity Consumption (J)': df[ENERGY_COLUMNS[0]].tolist(),
+        'Total Energy (J)': total.tolist(),
+        'building_info': dict(building_info),
+    }
+
+
+def read_typed(file_paths):
+    time_intervals = None
+    for i, file_path in enumerate(file_paths):
+        time_intervals, _ = read_building_output(file_path, str(i), {}, time_intervals)
+
+
+def run(n_files, rows, extra_columns):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, "source.csv")
+        write_synthetic_csv(source, rows, extra_columns)
+        file_paths = []
+        for i in range(n_files):
+            path = os.path.join(tmp_dir, f"modified_building_{i}.csv")
+            os.link(source, path)
+            file_paths.append(path)
+        batch_mb = os.path.getsize(source) * n_files / 1024 ** 2
+        print(f"{n_files} files, {rows} rows x {len(ENERGY_COLUMNS) + extra_columns + 1} columns, {batch_mb:.0f} MB")
+
+        start = time.perf_counter()
+        for i, file_path in enumerate(file_paths):
+            read_bare(file_path, str(i), {})
+        bare = time.perf_counter() - start
+
+        start = time.perf_counter()
+        read_typed(file_paths)
+        typed = time.perf_counter() - start
+
+    for label, seconds in (("bare pd.read_csv", bare), ("typed column reader", typed)):
+        print(f"{label:<22} {seconds:8.2f} s   {n_files / seconds:8.1f} files/s   {batch_mb / seconds:8.1f} MB/s")
+    print(f"speedup {bare / typed:.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=1000, help="number of CSV files in the batch")
+    parser.add_argument("--rows", type=int, default=8760, help="timesteps per file (35040 for 15-minute output)")
+    parser.add_argument("--extra-columns", type=int, default=30, help="meters in each file that the reader discards")
+    args = parser.parse_args()
+    run(args.files, args.rows, args.extra_columns)
@@ -0,0 +1,124 @@
+# benchmarks/generation.py
+"""
+Measure IDF generation throughput: buildings/sec, time per idf_operations function and peak
+memory, for 1, 4 and all-core worker counts.
+
+Synthetic building rows cycle through every function / building type / age range combination
+in configuration_setup and go through preprocess_building_data and the full process_building
+chain against data/Minimal.idf. No database or EnergyPlus installation is needed: without --idd
+or an existing IDDFILE the EnergyPlus 22.2 IDD in benchmarks/fixtures is used.
+
+Run from the repository root:
+    python -m benchmarks.generation --buildings 200
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from config import get_idf_config
+from config_manager import ConfigurationManager, preprocess_building_data
+from configuration_setup import get_configuration
+from generation_engine import generate_idfs
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# IDD of the EnergyPlus version Minimal.idf is written for, for machines without EnergyPlus
+FIXTURE_IDD = os.path.join(REPO_ROOT, "benchmarks", "fixtures", "Energy+V22_2_0.idd")
+
+
+def find_idd(explicit=None):
+    for candidate in (explicit, get_idf_config()['iddfile']):
+        if candidate and os.path.exists(candidate):
+            return candidate
+    return FIXTURE_IDD
+
+
+def building_combinations(data_structure):
+    for function, function_dict in data_structure["Building Functions"].items():
+        for building_type, age_ranges in function_dict["Building Types"].items():
+            for age_range in age_ranges:
+                yield function, building_type, age_range
+
+
+def synthetic_buildings(n, data_structure, seed=0):
+    """n building rows in the layout of the database query, cycling through every combination."""
+    rng = np.random.default_rng(seed)
+    combinations = list(building_combinations(data_structure))
+    rows = []
+    for i in range(n):
+        function, building_type, age_range = combinations[i % len(combinations)]
+        width, length = rng.uniform(6, 20), rng.uniform(8, 30)
+        rows.append({
+            "nummeraanduiding_id": str(100000 + i),
+            "meestvoorkomendepostcode": "2628ZL",
+            "function": function,
+            "building_type": building_type,
+            "age_range": age_range,
+            "height": float(rng.choice([3, 6, 9, 12, 15])),
+            "area": width * length,
+            "perimeter": 2 * (width + length),
+            "average_wwr": rng.uniform(0.15, 0.5),
+        })
+    return pd.DataFrame(rows)
+
+
+def run_generation(merged_df, base_idf_path, idd_path, config_manager, num_workers):
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        results = generate_idfs(merged_df, output_dir, base_idf_path, idd_path, config_manager, num_workers=num_workers)
+        elapsed = time.perf_counter() - start
+
+    function_times = defaultdict(list)
+    for result in results:
+        for span in result.get('spans', []):
+            function_times[span['stage']].append(span['seconds'])
+    failed = [r for r in results if r['status'] != 'success']
+    peak_worker_rss = max((r.get('rss_bytes') or 0 for r in results), default=0)
+    return elapsed, failed, function_times, peak_worker_rss
+
+
+def run(n_buildings, worker_counts, idd_path):
+    base_idf_path = os.path.join(REPO_ROOT, "data", "Minimal.idf")
+    idd_path = find_idd(idd_path)
+    print(f"Base IDF {base_idf_path}\nIDD      {idd_path}")
+
+    data_structure, config_checksum = get_configuration()
+    config_manager = ConfigurationManager(data_structure, {"seed": 0}, config_checksum=config_checksum)
+    buildings_df = synthetic_buildings(n_buildings, data_structure)
+    merged_df = preprocess_building_data(buildings_df, config_manager)
+    print(f"{len(merged_df)} buildings over {len(set(building_combinations(data_structure)))} function/type/age combinations\n")
+
+    for num_workers in worker_counts:
+        elapsed, failed, function_times, peak_worker_rss = run_generation(merged_df, base_idf_path, idd_path, config_manager, num_workers)
+        succeeded = len(merged_df) - len(failed)
+        # ru_maxrss of children is the largest peak of any worker process so far (KiB on Linux)
+        peak_children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        print(f"== {num_workers} worker(s): {succeeded / elapsed:.2f} buildings/s ({succeeded} ok, {len(failed)} failed, {elapsed:.1f} s wall)")
+        print(f"   peak worker RSS {peak_worker_rss / 1024 ** 2:.0f} MB reported, {peak_children:.0f} MB max RSS of any worker so far")
+        if failed:
+            print(f"   first failure: {failed[0]['error']}")
+
+        print(f"   {'function':<56} {'mean ms':>9} {'p95 ms':>9} {'share':>7}")
+        total = sum(sum(times) for stage, times in function_times.items() if stage != "generate")
+        for stage, times in sorted(function_times.items(), key=lambda item: -sum(item[1])):
+            if stage == "generate":
+                continue
+            print(f"   {stage:<56} {np.mean(times) * 1000:9.2f} {np.percentile(times, 95) * 1000:9.2f} {sum(times) / total:7.1%}")
+        print()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buildings", type=int, default=200, help="number of synthetic buildings per worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="worker counts to run (default: 1, 4 and all cores)")
+    parser.add_argument("--idd", default=None, help="Energy+.idd to use instead of IDDFILE or the bundled fixture")
+    args = parser.parse_args()
+    worker_counts = args.workers or sorted({1, 4, os.cpu_count() or 1})
+    run(args.buildings, worker_counts, args.idd)
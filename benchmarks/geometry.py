@@ -0,0 +1,67 @@
+# benchmarks/geometry.py
+"""
+Compare the closed-form rectangular block builder with the geomeppy path (add_block,
+intersect_match and set_wwr): time per building for create_building_block plus
+update_idf_for_fenestration, for a range of storey counts.
+
+Footprints, orientations and window-to-wall ratios come from the synthetic buildings of
+benchmarks/generation.py; only the height is set from --stories (3 m per storey).
+
+Run from the repository root:
+    python -m benchmarks.geometry --buildings 20 --stories 1 3 10 30
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.generation import REPO_ROOT, find_idd, synthetic_buildings
+from block_geometry import GEOMETRY_BUILDERS
+from configuration_setup import get_configuration
+from idf_operations import create_building_block, remove_building_object, update_idf_for_fenestration
+from idf_registry import IDFRegistry
+from idf_template import load_base_idf
+
+
+def time_geometry(rows, geometry, base_idf_path, idd_path):
+    """Seconds per building for the geometry steps, and the surface and window counts of the last one."""
+    times = []
+    for row in rows:
+        idf = IDFRegistry(load_base_idf(base_idf_path, idd_path))
+        remove_building_object(idf)
+        start = time.perf_counter()
+        create_building_block(idf, row, geometry)
+        update_idf_for_fenestration(idf, row)
+        times.append(time.perf_counter() - start)
+    counts = (len(idf.idfobjects['BUILDINGSURFACE:DETAILED']), len(idf.idfobjects['FENESTRATIONSURFACE:DETAILED']))
+    return times, counts
+
+
+def run(n_buildings, stories, idd_path):
+    base_idf_path = os.path.join(REPO_ROOT, "data", "Minimal.idf")
+    idd_path = find_idd(idd_path)
+    data_structure, _ = get_configuration()
+    buildings_df = synthetic_buildings(n_buildings, data_structure)
+    buildings_df["orientation"] = np.resize([0, 30, 90, 200], len(buildings_df))
+    print(f"{n_buildings} buildings per storey count\n")
+
+    print(f"{'stories':>7} {'builder':>9} {'mean ms':>9} {'p95 ms':>9} {'surfaces':>9} {'windows':>8} {'speedup':>8}")
+    for num_stories in stories:
+        rows = buildings_df.assign(height=3.0 * num_stories).to_dict('records')
+        means = {}
+        for geometry in reversed(GEOMETRY_BUILDERS):
+            times, (surfaces, windows) = time_geometry(rows, geometry, base_idf_path, idd_path)
+            means[geometry] = np.mean(times)
+            speedup = f"{means['geomeppy'] / means[geometry]:7.1f}x"
+            print(f"{num_stories:>7} {geometry:>9} {means[geometry] * 1000:9.2f} {np.percentile(times, 95) * 1000:9.2f} "
+                  f"{surfaces:>9} {windows:>8} {speedup:>8}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buildings", type=int, default=20, help="number of synthetic buildings per storey count")
+    parser.add_argument("--stories", type=int, nargs="+", default=[1, 3, 10, 30], help="storey counts to compare")
+    parser.add_argument("--idd", default=None, help="Energy+.idd to use instead of IDDFILE or the bundled fixture")
+    args = parser.parse_args()
+    run(args.buildings, args.stories, args.idd)
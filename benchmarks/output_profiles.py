@@ -0,0 +1,66 @@
+# benchmarks/output_profiles.py
+"""
+Measure the EnergyPlus output bytes and simulation seconds an output profile saves.
+
+Every generated IDF in --idf-dir is simulated once per profile in its own temporary directory,
+with the simulation cache disabled. Needs a working EnergyPlus installation (IDDFILE, EPWFILE).
+
+Run from the repository root:
+    python -m benchmarks.output_profiles --idf-dir /app/output/runs/<run_id> --limit 10
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from config import get_idf_config
+from output_profiles import OUTPUT_PROFILES
+from runner_generator import run_simulation
+
+
+def simulate_profile(idf_paths, profile, epwfile, iddfile, reporting_frequency):
+    totals = {"runs": 0, "failed": 0, "seconds": 0.0, "output_bytes": 0}
+    with tempfile.TemporaryDirectory() as run_dir:
+        for idf_path in idf_paths:
+            target = os.path.join(run_dir, os.path.basename(idf_path))
+            shutil.copy(idf_path, target)
+            result = run_simulation((target, epwfile, iddfile, {"reporting_frequency": reporting_frequency, "output_profile": profile}))
+            if result['status'] != 'success':
+                totals['failed'] += 1
+                print(f"{profile}: {os.path.basename(idf_path)} failed: {result['error']}")
+                continue
+            totals['runs'] += 1
+            totals['seconds'] += result['seconds']
+            totals['output_bytes'] += result['output_bytes']
+    return totals
+
+
+def run(idf_dir, limit, reporting_frequency):
+    # Every run has to execute EnergyPlus, not be served from earlier outputs
+    os.environ['SIM_CACHE_ENABLED'] = "false"
+    idf_config = get_idf_config()
+    idf_paths = sorted(
+        os.path.join(idf_dir, name) for name in os.listdir(idf_dir) if name.startswith("modified_building") and name.endswith(".idf")
+    )[:limit]
+    print(f"{len(idf_paths)} IDFs from {idf_dir}, reporting frequency {reporting_frequency}")
+
+    results = {profile: simulate_profile(idf_paths, profile, idf_config['epwfile'], idf_config['iddfile'], reporting_frequency)
+               for profile in OUTPUT_PROFILES}
+    for profile, totals in results.items():
+        print(f"{profile:<18} {totals['runs']:4d} runs   {totals['output_bytes'] / 1024 ** 2:10.1f} MB   "
+              f"{totals['seconds']:8.1f} s   failed {totals['failed']}")
+
+    baseline = results["full-diagnostics"]
+    for profile, totals in results.items():
+        if profile != "full-diagnostics" and totals['runs'] == baseline['runs'] and baseline['runs']:
+            print(f"{profile} saves {(baseline['output_bytes'] - totals['output_bytes']) / 1024 ** 2:.1f} MB and "
+                  f"{baseline['seconds'] - totals['seconds']:.1f} s over full-diagnostics")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idf-dir", required=True, help="directory with generated modified_building_*.idf files")
+    parser.add_argument("--limit", type=int, default=10, help="number of IDFs to simulate per profile")
+    parser.add_argument("--reporting-frequency", default="timestep", help="timestep, hourly, daily or monthly")
+    args = parser.parse_args()
+    run(args.idf_dir, args.limit, args.reporting_frequency)
@@ -0,0 +1,127 @@
+# benchmarks/simulation.py
+"""
+Load-test simulation scheduling, the simulation cache and post-processing with the fake EnergyPlus
+(SIMULATOR=fake), so their overhead can be tracked separately from EnergyPlus itself.
+
+N IDFs are written from data/Minimal.idf with the generator's output requests, a few zones, a
+water heater and a boiler; --unique of them differ, the rest repeat and hit the cache. Each pass
+runs simulate_all and process_output_files on them, the first against an empty cache.
+
+Run from the repository root:
+    python -m benchmarks.simulation --buildings 10000 --unique 2500 --reporting-frequency hourly --output-profile energy-summary
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+from eppy.modeleditor import IDF
+
+from benchmarks.generation import REPO_ROOT, find_idd
+from config import get_idf_config
+from idf_operations import check_and_add_idfobject
+from idf_registry import IDFRegistry
+from json_processor import process_output_files
+from runner_generator import simulate_all
+from timing import TimingRecorder, print_timing_report
+
+
+def template_idf_text(idd_path, reporting_frequency, zones):
+    IDF.setiddname(idd_path)
+    idf = IDFRegistry(IDF(os.path.join(REPO_ROOT, "data", "Minimal.idf")))
+    check_and_add_idfobject(idf, reporting_frequency)
+    for i in range(zones):
+        idf.newidfobject("ZONE", Name=f"Zone{i + 1}")
+    idf.newidfobject("WATERHEATER:MIXED", Name="SHWSys1_Water_Heater")
+    idf.newidfobject("BOILER:HOTWATER", Name="Central Boiler")
+    return idf.idfstr()
+
+
+def write_idfs(idf_dir, n_buildings, unique, template):
+    """Writes modified_building_<id>.idf files, of which only `unique` have distinct contents."""
+    os.makedirs(idf_dir, exist_ok=True)
+    building_ids = [str(100000 + i) for i in range(n_buildings)]
+    for i, building_id in enumerate(building_ids):
+        variant = i % unique
+        with open(os.path.join(idf_dir, f"modified_building_{building_id}.idf"), "w") as f:
+            f.write(template + f"\nSchedule:Constant,\n    Benchmark Variant {variant},\n    ,\n    {variant};\n")
+    return pd.DataFrame({"nummeraanduiding_id": building_ids, "function": "Residential"})
+
+
+def run_pass(label, idf_dir, buildings_df, epwfile, idd_path, output_options, workers):
+    timings = TimingRecorder()
+    start = time.perf_counter()
+    results = simulate_all(idf_dir, epwfile, idd_path, output_options)
+    simulate_seconds = time.perf_counter() - start
+    for result in results:
+        timings.add(os.path.basename(result['idf_path']), result['spans'])
+
+    start = time.perf_counter()
+    process_output_files(idf_dir, buildings_df, output_options['reporting_frequency'])
+    postprocess_seconds = time.perf_counter() - start
+
+    succeeded = [r for r in results if r['status'] == 'success']
+    hits = sum(1 for r in succeeded if r['cache_hit'])
+    report = timings.summary()
+    busy = sum(stats['total'] for stats in report.values())
+    energyplus = report.get('energyplus', {}).get('total', 0.0)
+    n = len(results)
+
+    print(f"== {label}: {n / simulate_seconds:.1f} simulations/s ({len(succeeded)} ok, {n - len(succeeded)} failed, "
+          f"{hits} cache hits, {simulate_seconds:.1f} s wall)")
+    print(f"   per simulation: {energyplus / n * 1000:.2f} ms simulator, {(busy - energyplus) / n * 1000:.2f} ms setup/cache, "
+          f"{max(0.0, simulate_seconds * workers - busy) / n * 1000:.2f} ms pool overhead")
+    print(f"   outputs {sum(r['output_bytes'] or 0 for r in succeeded) / 1024 ** 2:.1f} MB; "
+          f"post-processing {postprocess_seconds:.1f} s ({postprocess_seconds / max(1, len(succeeded)) * 1000:.2f} ms per building)")
+    print_timing_report(report)
+    print()
+
+
+def run(n_buildings, unique, workers, passes, latency, jitter, failure_rate, reporting_frequency, output_profile, result_source, zones, idd_path):
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.environ.update({
+            "SIMULATOR": "fake",
+            "FAKE_EP_LATENCY": str(latency),
+            "FAKE_EP_JITTER": str(jitter),
+            "FAKE_EP_FAILURE_RATE": str(failure_rate),
+            "SIMULATION_WORKERS": str(workers),
+            "RESULT_SOURCE": result_source,
+            "SIM_CACHE_ENABLED": "true",
+            "SIM_CACHE_DIR": os.path.join(work_dir, "sim_cache"),
+        })
+        idd_path = find_idd(idd_path)
+        epwfile = get_idf_config()['epwfile']
+        if not os.path.exists(epwfile):
+            epwfile = os.path.join(REPO_ROOT, "data", "NLD_Amsterdam.062400_IWEC.epw")
+
+        start = time.perf_counter()
+        idf_dir = os.path.join(work_dir, "idfs")
+        template = template_idf_text(idd_path, reporting_frequency, zones)
+        buildings_df = write_idfs(idf_dir, n_buildings, min(unique or n_buildings, n_buildings), template)
+        print(f"{n_buildings} IDFs ({unique or n_buildings} distinct) written in {time.perf_counter() - start:.1f} s; "
+              f"{workers} workers, {reporting_frequency}, {output_profile}, {result_source} results, "
+              f"fake latency {latency}+/-{jitter} s\n")
+
+        output_options = {"reporting_frequency": reporting_frequency, "output_profile": output_profile}
+        for i in range(passes):
+            run_pass("cold cache" if i == 0 else f"warm cache (pass {i + 1})", idf_dir, buildings_df, epwfile, idd_path, output_options, workers)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buildings", type=int, default=1000, help="number of IDFs to simulate per pass")
+    parser.add_argument("--unique", type=int, default=None, help="number of distinct IDFs (default: all distinct)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="simulation workers")
+    parser.add_argument("--passes", type=int, default=2, help="passes over the same IDFs; later ones hit the cache")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per fake simulation")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of deterministic latency jitter")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of fake simulations that fail")
+    parser.add_argument("--reporting-frequency", default="timestep", help="timestep, hourly, daily or monthly")
+    parser.add_argument("--output-profile", default="full-diagnostics", help="full-diagnostics or energy-summary")
+    parser.add_argument("--result-source", default="sqlite", help="sqlite or csv")
+    parser.add_argument("--zones", type=int, default=5, help="zones in each IDF (zone variables are reported per zone)")
+    parser.add_argument("--idd", default=None, help="Energy+.idd to use instead of IDDFILE or the bundled fixture")
+    args = parser.parse_args()
+    run(args.buildings, args.unique, args.workers, args.passes, args.latency, args.jitter, args.failure_rate,
+        args.reporting_frequency, args.output_profile, args.result_source, args.zones, args.idd)
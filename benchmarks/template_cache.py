@@ -0,0 +1,94 @@
+# benchmarks/template_cache.py
+"""
+Compare per-building generation time with and without the base IDF template cache.
+
+Run from the repository root:
+    python -m benchmarks.template_cache --buildings 20
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from geomeppy import IDF
+
+import generation_engine
+from config import get_idf_config
+from config_manager import ConfigurationManager
+from configuration_setup import setup_configurations
+from idf_template import clear_templates, load_base_idf
+
+
+def parse_every_time(base_idf_path, idd_path):
+    # The loader process_building used before the template cache
+    IDF.setiddname(idd_path)
+    return IDF(base_idf_path)
+
+
+def sample_row(i):
+    return {
+        "nummeraanduiding_id": str(1000 + i),
+        "function": "Residential",
+        "building_type": "Apartment",
+        "age_range": "1992 - 2005",
+        "height": 9,
+        "area": 120.0,
+        "perimeter": 44.0,
+        "average_wwr": 0.3,
+    }
+
+
+def time_loads(loader, base_idf_path, idd_path, n):
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        loader(base_idf_path, idd_path)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_buildings(loader, base_idf_path, idd_path, config_manager, n):
+    original_loader = generation_engine.load_base_idf
+    generation_engine.load_base_idf = loader
+    timings = []
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            for i in range(n):
+                start = time.perf_counter()
+                generation_engine.process_building(sample_row(i), base_idf_path, idd_path, output_dir, config_manager)
+                timings.append(time.perf_counter() - start)
+    finally:
+        generation_engine.load_base_idf = original_loader
+    return timings
+
+
+def report(label, timings):
+    print(f"{label:<28} mean {statistics.mean(timings) * 1000:9.2f} ms   "
+          f"median {statistics.median(timings) * 1000:9.2f} ms   n={len(timings)}")
+
+
+def run(n_buildings):
+    idf_config = get_idf_config()
+    base_idf_path = idf_config['idf_file_path']
+    idd_path = idf_config['iddfile']
+    if not os.path.exists(base_idf_path):
+        base_idf_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "Minimal.idf")
+
+    # Warm the IDD once so both variants are measured in a steady state
+    clear_templates()
+    parse_every_time(base_idf_path, idd_path)
+
+    config_manager = ConfigurationManager(setup_configurations(), {})
+
+    report("load: parse per building", time_loads(parse_every_time, base_idf_path, idd_path, n_buildings))
+    report("load: template clone", time_loads(load_base_idf, base_idf_path, idd_path, n_buildings))
+    report("building: parse per building", time_buildings(parse_every_time, base_idf_path, idd_path, config_manager, n_buildings))
+    report("building: template clone", time_buildings(load_base_idf, base_idf_path, idd_path, config_manager, n_buildings))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buildings", type=int, default=20, help="number of buildings to time per variant")
+    args = parser.parse_args()
+    run(args.buildings)
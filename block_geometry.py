@@ -0,0 +1,179 @@
+# block_geometry.py
+import math
+
+# How the building block is built: in closed form for rectangular footprints, or always through geomeppy
+GEOMETRY_BUILDERS = ["analytic", "geomeppy"]
+
+
+def is_rectangle(coordinates, tolerance=1e-6):
+    """True if the (x, y) footprint is a rectangle, in any orientation."""
+    points = list(coordinates)
+    if len(points) > 1 and points[0] == points[-1]:
+        points = points[:-1]
+    if len(points) != 4:
+        return False
+    edges = [(points[(i + 1) % 4][0] - x, points[(i + 1) % 4][1] - y) for i, (x, y) in enumerate(points)]
+    lengths = [math.hypot(dx, dy) for dx, dy in edges]
+    if min(lengths) <= tolerance:
+        return False
+    # Every corner is a right angle
+    return all(abs(a[0] * b[0] + a[1] * b[1]) <= tolerance * la * lb
+               for a, b, la, lb in zip(edges, edges[1:] + edges[:1], lengths, lengths[1:] + lengths[:1]))
+
+
+def _vertex_fields(vertices):
+    fields = {}
+    for i, (x, y, z) in enumerate(vertices, 1):
+        fields[f"Vertex_{i}_Xcoordinate"] = x
+        fields[f"Vertex_{i}_Ycoordinate"] = y
+        fields[f"Vertex_{i}_Zcoordinate"] = z
+    return fields
+
+
+def _add_surface(idf, name, surface_type, zone_name, vertices, boundary, boundary_object=""):
+    exposed = "SunExposed" if boundary == "outdoors" else "NoSun"
+    return idf.newidfobject(
+        "BUILDINGSURFACE:DETAILED",
+        Name=name,
+        Surface_Type=surface_type,
+        Zone_Name=zone_name,
+        Outside_Boundary_Condition=boundary,
+        Outside_Boundary_Condition_Object=boundary_object,
+        Sun_Exposure=exposed,
+        Wind_Exposure="WindExposed" if boundary == "outdoors" else "NoWind",
+        View_Factor_to_Ground="autocalculate",
+        **_vertex_fields(vertices),
+    )
+
+
+def modelled_stories(num_stories, zone_multipliers=False):
+    """
+    (storey, multiplier) for each storey that gets a zone.
+
+    With zone multipliers a block of more than three storeys is reduced to its ground storey, the
+    first middle storey standing in for all num_stories - 2 middle storeys, and its top storey.
+    """
+    if zone_multipliers and num_stories > 3:
+        return [(0, 1), (1, num_stories - 2), (num_stories - 1, 1)]
+    return [(storey, 1) for storey in range(num_stories)]
+
+
+def add_rectangular_block(idf, name, coordinates, height, num_stories, zone_multipliers=False):
+    """
+    Add a rectangular block of num_stories zones, as geomeppy's add_block followed by intersect_match.
+
+    Zones and surfaces are named as geomeppy names them ("Block <name> Storey <n> Wall 0001", ...).
+    Vertices follow the UpperLeftCorner / CounterClockWise rules of the base IDF, and each ceiling
+    is matched to the floor of the storey above. With zone_multipliers only the storeys of
+    modelled_stories get zones, each at its own height, and the multiplied zone's floor and ceiling
+    and the ones facing them are adiabatic. Returns the exterior walls for add_windows.
+    """
+    points = [(float(x), float(y)) for x, y in coordinates]
+    if len(points) > 1 and points[0] == points[-1]:
+        points = points[:-1]
+    # Counterclockwise seen from above, so walls face outwards
+    if sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1])) < 0:
+        points.reverse()
+    storey_height = float(height) / num_stories
+
+    def at(indexes, z):
+        return [(points[i][0], points[i][1], z) for i in indexes]
+
+    stories = modelled_stories(num_stories, zone_multipliers)
+    walls = []
+    for i, (storey, multiplier) in enumerate(stories):
+        zone_name = f"Block {name} Storey {storey}"
+        floor_z, ceiling_z = storey_height * storey, storey_height * (storey + 1)
+        if multiplier > 1:
+            idf.newidfobject("ZONE", Name=zone_name, Multiplier=multiplier)
+        else:
+            idf.newidfobject("ZONE", Name=zone_name)
+
+        for edge in range(4):
+            (x1, y1), (x2, y2) = points[edge], points[(edge + 1) % 4]
+            walls.append(_add_surface(
+                idf, f"{zone_name} Wall {edge + 1:04d}", "wall", zone_name,
+                [(x1, y1, ceiling_z), (x1, y1, floor_z), (x2, y2, floor_z), (x2, y2, ceiling_z)], "outdoors"))
+
+        # Floors face down (footprint reversed), ceilings and roofs face up. A multiplied zone
+        # cannot exchange heat with a single neighbour without breaking conservation of energy,
+        # so the floors and ceilings between it and its neighbours are adiabatic
+        floor = at([2, 1, 0, 3], floor_z)
+        if i == 0:
+            _add_surface(idf, f"{zone_name} Floor 0001", "floor", zone_name, floor, "ground")
+        elif max(multiplier, stories[i - 1][1]) > 1:
+            _add_surface(idf, f"{zone_name} Floor 0001", "floor", zone_name, floor, "adiabatic")
+        else:
+            _add_surface(idf, f"{zone_name} Floor 0001", "floor", zone_name, floor, "surface",
+                         f"Block {name} Storey {stories[i - 1][0]} Ceiling 0001")
+        ceiling = at([1, 2, 3, 0], ceiling_z)
+        if i == len(stories) - 1:
+            _add_surface(idf, f"{zone_name} Roof 0001", "roof", zone_name, at([1, 2, 3, 0], float(height)), "outdoors")
+        elif max(multiplier, stories[i + 1][1]) > 1:
+            _add_surface(idf, f"{zone_name} Ceiling 0001", "ceiling", zone_name, ceiling, "adiabatic")
+        else:
+            _add_surface(idf, f"{zone_name} Ceiling 0001", "ceiling", zone_name, ceiling, "surface",
+                         f"Block {name} Storey {stories[i + 1][0]} Floor 0001")
+    return walls
+
+
+def _vertex_set(surface, digits=4):
+    vertices = set()
+    i = 1
+    while f"Vertex_{i}_Xcoordinate" in surface.objls and surface[f"Vertex_{i}_Xcoordinate"] != "":
+        vertices.add(tuple(round(float(surface[f"Vertex_{i}_{axis}coordinate"]), digits) for axis in "XYZ"))
+        i += 1
+    return frozenset(vertices)
+
+
+def match_stacked_surfaces(idf):
+    """
+    Pair each outdoor ceiling with the outdoor floor of another zone on the same polygon.
+
+    geomeppy's intersect_match splits the ceilings and floors between storeys but leaves them
+    outdoors, because their vertices start at different corners. This pairs them as
+    add_rectangular_block does, so both builders model the same heat flow between storeys.
+    """
+    floors = {}
+    for floor in idf.surfaces_of_type("floor"):
+        if floor.Outside_Boundary_Condition.lower() == "outdoors":
+            floors.setdefault(_vertex_set(floor), []).append(floor)
+    for ceiling in idf.surfaces_of_type("ceiling"):
+        if ceiling.Outside_Boundary_Condition.lower() != "outdoors":
+            continue
+        polygon = _vertex_set(ceiling)
+        floor = next((floor for floor in floors.get(polygon, []) if floor.Zone_Name != ceiling.Zone_Name), None)
+        if floor is None:
+            continue
+        floors[polygon] = [other for other in floors[polygon] if other is not floor]
+        for surface, other in ((ceiling, floor), (floor, ceiling)):
+            surface.Outside_Boundary_Condition = "surface"
+            surface.Outside_Boundary_Condition_Object = other.Name
+            surface.Sun_Exposure = "NoSun"
+            surface.Wind_Exposure = "NoWind"
+
+
+def window_vertices(wall, wwr):
+    """Window on a four-vertex wall as geomeppy's set_wwr places it: a strip wwr of the wall's height, mid-wall."""
+    vertices = [(wall[f"Vertex_{i}_Xcoordinate"], wall[f"Vertex_{i}_Ycoordinate"], wall[f"Vertex_{i}_Zcoordinate"])
+                for i in range(1, 5)]
+    average_x, average_y, average_z = (sum(axis) / 4 for axis in zip(*vertices))
+    # 0.1% in from the edges, as geomeppy does, so the window stays inside the wall
+    return [((x - average_x) * 0.999 + average_x, (y - average_y) * 0.999 + average_y, (z - average_z) * wwr + average_z)
+            for x, y, z in vertices]
+
+
+def add_windows(idf, walls, wwr, construction):
+    """Add one window per wall at the given window-to-wall ratio (none when wwr is 0)."""
+    if not wwr:
+        return
+    for wall in walls:
+        idf.newidfobject(
+            "FENESTRATIONSURFACE:DETAILED",
+            Name=f"{wall.Name} window",
+            Surface_Type="Window",
+            Construction_Name=construction,
+            Building_Surface_Name=wall.Name,
+            View_Factor_to_Ground="autocalculate",
+            **_vertex_fields(window_vertices(wall, wwr)),
+        )
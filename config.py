@@ -31,6 +31,61 @@ def get_idf_config():
         "output_dir": os.getenv('OUTPUT_DIR', "/app/output")
     }
 
+def get_configuration_config():
+    return {
+        # Prebuilt configuration artifact (python configuration_setup.py <path>); built in-process if missing
+        "artifact_path": os.getenv('CONFIG_ARTIFACT', "/app/data/configuration.json")
+    }
+
+def get_generation_config():
+    return {
+        "num_workers": int(os.getenv('GENERATION_WORKERS', os.cpu_count() or 1)),
+        "chunk_size": int(os.getenv('GENERATION_CHUNK_SIZE', 25))
+    }
+
+def get_simulation_config():
+    return {
+        "num_workers": int(os.getenv('SIMULATION_WORKERS', 4)),
+        # Generated IDFs allowed to wait for a simulation slot before generation pauses
+        "max_pending": int(os.getenv('PIPELINE_MAX_PENDING', 16)),
+        # "sqlite" reads results from each run's SQLite output; "csv" runs ReadVarsESO and reads the CSV
+        "result_source": os.getenv('RESULT_SOURCE', "sqlite"),
+        # "energyplus" runs EnergyPlus; "fake" writes synthetic outputs (see fake_energyplus.py) for load tests
+        "simulator": os.getenv('SIMULATOR', "energyplus")
+    }
+
+def get_fake_simulator_config():
+    return {
+        # Seconds each fake simulation takes, +/- a deterministic jitter per IDF
+        "latency_seconds": float(os.getenv('FAKE_EP_LATENCY', 0)),
+        "latency_jitter": float(os.getenv('FAKE_EP_JITTER', 0)),
+        # Fraction of IDFs whose fake simulation fails
+        "failure_rate": float(os.getenv('FAKE_EP_FAILURE_RATE', 0))
+    }
+
+def get_simulation_cache_config():
+    return {
+        "enabled": os.getenv('SIM_CACHE_ENABLED', "true").lower() in ("1", "true", "yes"),
+        "cache_dir": os.getenv('SIM_CACHE_DIR', os.path.join(get_idf_config()['output_dir'], "sim_cache")),
+        "max_bytes": int(float(os.getenv('SIM_CACHE_MAX_GB', 5)) * 1024 ** 3),
+        "energyplus_version": os.getenv('ENERGYPLUS_VERSION', "22.2.0")
+    }
+
+def get_workspace_config():
+    return {
+        "root": os.getenv('WORKSPACE_ROOT', os.path.join(get_idf_config()['output_dir'], "runs")),
+        # Workspaces older than this are deleted when a new run starts
+        "retention_hours": float(os.getenv('WORKSPACE_RETENTION_HOURS', 24)),
+        # "keep" leaves every file; "result_only" deletes IDF/simulation files once the run has its result
+        "cleanup": os.getenv('WORKSPACE_CLEANUP', "keep")
+    }
+
+def get_job_config():
+    return {
+        "db_path": os.getenv('JOBS_DB', os.path.join(get_idf_config()['output_dir'], "jobs.sqlite3")),
+        "num_workers": int(os.getenv('JOB_WORKERS', 2))
+    }
+
 
 #def get_idf_config():
 #    return {
@@ -1,41 +1,146 @@
 # config_manager.py
+import hashlib
+import json
 import random
+from collections.abc import Mapping
+from types import MappingProxyType
+import numpy as np
 import pandas as pd
 
+from block_geometry import GEOMETRY_BUILDERS
+from fidelity_profiles import DEFAULT_FIDELITY_PROFILE, FIDELITY_PROFILES
+from output_profiles import DEFAULT_OUTPUT_PROFILE, OUTPUT_PROFILES
+
+# Reporting frequencies a run can request for its output meters and variables
+REPORTING_FREQUENCIES = ("timestep", "hourly", "daily", "monthly")
+
+ENVELOPE_GROUP = "envelop parameters"
+ENVELOPE_OBJECT_TYPES = ["material", "material:nomass", "windowmaterial:simpleglazingsystem"]
+
+def freeze(value):
+    """Returns a read-only copy of a nested configuration value (dicts become mapping proxies)."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
 class ConfigurationManager:
-    def __init__(self, data, user_config, default_niveau="niveau 1"):
+    """
+    Read-only view of the configuration tree for one run.
+
+    The nested tree is compiled once, at construction, into flat lookup tables keyed by the full
+    (function, building_type, age_range, niveau, object_group, object_type, object_name) path, with
+    the user modifications already merged in. Lookups are plain dict reads that never modify
+    anything, so one manager can be shared by threads and pickled to worker processes.
+    """
+
+    def __init__(self, data, user_config, default_niveau="niveau 1", config_checksum=None):
         self.data = data
         self.user_selections = user_config.get("user_selections", {})
         self.user_modifications = user_config.get("user_modifications", {})
         self.default_niveau = default_niveau
+        # Checksum of the effective configuration (base tree plus user choices), for cache keys
+        effective = {
+            "base": config_checksum,
+            "user_selections": self.user_selections,
+            "user_modifications": self.user_modifications,
+            "default_niveau": default_niveau,
+        }
+        self.checksum = hashlib.sha256(json.dumps(effective, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        # How often meters and variables are reported; most dashboards only need hourly or monthly data
+        self.reporting_frequency = str(user_config.get("reporting_frequency", "timestep")).lower()
+        if self.reporting_frequency not in REPORTING_FREQUENCIES:
+            raise ValueError(f"reporting_frequency must be one of {', '.join(REPORTING_FREQUENCIES)}, got {self.reporting_frequency!r}")
+        # Which output requests the simulations keep (see output_profiles.OUTPUT_PROFILES)
+        self.output_profile = user_config.get("output_profile", DEFAULT_OUTPUT_PROFILE)
+        if self.output_profile not in OUTPUT_PROFILES:
+            raise ValueError(f"output_profile must be one of {', '.join(OUTPUT_PROFILES)}, got {self.output_profile!r}")
+        # How the building block is built (see block_geometry.GEOMETRY_BUILDERS)
+        self.geometry = user_config.get("geometry", "analytic")
+        if self.geometry not in GEOMETRY_BUILDERS:
+            raise ValueError(f"geometry must be one of {', '.join(GEOMETRY_BUILDERS)}, got {self.geometry!r}")
+        # Model tall blocks as ground, one multiplied middle and top storey (see block_geometry.modelled_stories)
+        self.zone_multipliers = bool(user_config.get("zone_multipliers", False))
+        # Timestep, warmup, solar and convergence settings (see fidelity_profiles.FIDELITY_PROFILES)
+        self.fidelity = user_config.get("fidelity", DEFAULT_FIDELITY_PROFILE)
+        if self.fidelity not in FIDELITY_PROFILES:
+            raise ValueError(f"fidelity must be one of {', '.join(FIDELITY_PROFILES)}, got {self.fidelity!r}")
+        # Per-run seed; without one the run gets a fresh seed, which is kept so it can be reproduced
+        self.seed = user_config.get("seed")
+        if self.seed is None:
+            self.seed = random.SystemRandom().randrange(2 ** 32)
+        self._compile()
+
+    def __getstate__(self):
+        # Mapping proxies cannot be pickled; workers rebuild the tables from the plain tree instead
+        state = self.__dict__.copy()
+        del state["_parameters"], state["_object_names"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._compile()
+
+    def _apply_user_modifications(self, object_name, param_values):
+        # Returns a merged copy; the shared configuration tree itself is never written to
+        if param_values is None or object_name not in self.user_modifications:
+            return param_values
+        param_values = dict(param_values)
+        for param_name, user_value in self.user_modifications[object_name].items():
+            if user_value.get("autosize_allowed", False):
+                param_values[param_name] = "Autosize"
+            else:
+                param_values[param_name] = user_value
+        return param_values
+
+    def _compile(self):
+        # Flatten the nested tree into path-keyed tables of frozen parameter values
+        parameters = {}
+        object_names = {}
+        for function, function_dict in self.data["Building Functions"].items():
+            for building_type, age_ranges in function_dict["Building Types"].items():
+                for age_range, age_dict in age_ranges.items():
+                    for niveau, object_groups in age_dict["niveaux"].items():
+                        for object_group, object_types in object_groups.items():
+                            for object_type, objects in object_types.items():
+                                path = (function, building_type, age_range, niveau, object_group, object_type)
+                                object_names[path] = tuple(objects)
+                                for object_name, param_values in objects.items():
+                                    parameters[path + (object_name,)] = freeze(self._apply_user_modifications(object_name, param_values))
+        self._parameters = parameters
+        self._object_names = object_names
 
     def get_niveau(self, function, building_type, age_range):
         # Retrieves the selected niveau for a given function, building type, and age range
         return self.user_selections.get(function, {}).get(building_type, {}).get(age_range, self.default_niveau)
 
     def get_parameter_values(self, function, building_type, age_range, niveau=None, object_group=None, object_type=None, object_name=None):
-        # Retrieves the parameter values for a specific object
+        # Retrieves the read-only parameter values for a specific object, user modifications included
         niveau = niveau if niveau else self.default_niveau
         try:
-            param_values = self.data["Building Functions"][function]["Building Types"][building_type][age_range]["niveaux"][niveau][object_group][object_type][object_name]
-
-            # Apply user modifications if available
-            if object_name in self.user_modifications:
-                user_params = self.user_modifications[object_name]
-                for param_name, user_value in user_params.items():
-                    if user_value.get("autosize_allowed", False):
-                        param_values[param_name] = "Autosize"
-                    else:
-                        param_values[param_name] = user_value
-
-            return param_values
-
+            return self._parameters[(function, building_type, age_range, niveau, object_group, object_type, object_name)]
         except KeyError:
             raise ValueError(f"Configuration for {function} -> {building_type} -> {age_range} -> {niveau} -> {object_group} -> {object_type} -> {object_name} not found.")
 
-    def get_random_value(self, min_val, max_val):
-        # Generates a random value between min_val and max_val
-        return random.uniform(min_val, max_val)
+    def get_object_names(self, function, building_type, age_range, niveau, object_group, object_type):
+        # Lists the configured object names of one object type, or an empty list if there are none
+        return list(self._object_names.get((function, building_type, age_range, niveau, object_group, object_type), ()))
+
+    def building_key(self, building_id):
+        # 64-bit key of a building's random stream, derived from the run seed and the building ID
+        digest = hashlib.sha256(f"{self.seed}:{building_id}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big")
+
+    def building_rng(self, building_id):
+        # Independent random stream per building, derived from the run seed and the building ID,
+        # so results do not depend on generation order, worker count or other threads
+        return random.Random(self.building_key(building_id))
+
+    def get_random_value(self, min_val, max_val, rng=None):
+        # Generates a random value between min_val and max_val, from the building's stream if given
+        return (rng or random).uniform(min_val, max_val)
 
     def get_ground_temperatures(self):
         # Adjust ground temperatures based on user modifications
@@ -62,35 +167,88 @@ class ConfigurationManager:
         return ground_temps
 
 
-def preprocess_building_data(buildings_df, config_manager):
+def envelope_column(object_name, param_name):
+    """Column name of a presampled envelope property, e.g. 'ext_walls.thickness'."""
+    return f"{object_name}.{param_name}"
+
+
+def _column_counter(column):
+    # Stable per-column counter, so a property's value does not depend on which other columns exist
+    return int.from_bytes(hashlib.sha256(column.encode("utf-8")).digest()[:8], "big")
+
+
+def _uniforms(building_keys, column_counters):
     """
-    Preprocesses the building data and applies the configurations based on user selections and modifications.
-    
-    This is where the configuration logic is applied to each building based on the provided DataFrame.
+    Uniform [0, 1) draws for every (building, column) pair in one vectorized step.
+
+    This is SplitMix64 applied to the building key plus a per-column counter: a counter-based
+    generator, so each value depends only on the seed, the building ID and the column.
+    """
+    z = building_keys[:, None] + (column_counters[None, :] + np.uint64(1)) * np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def sample_envelope_properties(buildings_df, config_manager):
     """
-    merged_data = []
+    Samples every envelope property of every building and returns them as a columnar DataFrame
+    (one 'object.parameter' column per property) aligned with buildings_df's index.
 
-    for _, building_row in buildings_df.iterrows():
-        function = building_row["function"]
-        building_type = building_row["building_type"]
-        age_range = building_row["age_range"]
+    Buildings are grouped by (function, building_type, age_range, niveau) and all min/max
+    parameters of a group are drawn in a single NumPy operation.
+    """
+    building_ids = buildings_df["nummeraanduiding_id"].tolist()
+    building_keys = np.fromiter((config_manager.building_key(b) for b in building_ids), dtype=np.uint64, count=len(building_ids))
 
-        # Determine the appropriate niveau
+    group_frames = []
+    for (function, building_type, age_range), positions in buildings_df.groupby(["function", "building_type", "age_range"], sort=False).indices.items():
         niveau = config_manager.get_niveau(function, building_type, age_range)
-        building_data = building_row.to_dict()
 
-        # Apply configurations to the building data
-        for object_group in ["envelop parameters"]:
-            for object_type in ["material", "material:nomass", "windowmaterial:simpleglazingsystem"]:
-                if object_type in config_manager.data["Building Functions"][function]["Building Types"][building_type][age_range]["niveaux"][niveau][object_group]:
-                    for object_name in config_manager.data["Building Functions"][function]["Building Types"][building_type][age_range]["niveaux"][niveau][object_group][object_type].keys():
-                        param_values = config_manager.get_parameter_values(function, building_type, age_range, niveau, object_group=object_group, object_type=object_type, object_name=object_name)
-                        building_data[object_name] = param_values
+        # Collect the group's properties: min/max ranges to sample and fixed values to copy
+        ranged_columns, lows, highs = [], [], []
+        fixed_columns = {}
+        for object_type in ENVELOPE_OBJECT_TYPES:
+            for object_name in config_manager.get_object_names(function, building_type, age_range, niveau, ENVELOPE_GROUP, object_type):
+                params = config_manager.get_parameter_values(function, building_type, age_range, niveau, object_group=ENVELOPE_GROUP, object_type=object_type, object_name=object_name)
+                for param_name, param in params.items():
+                    column = envelope_column(object_name, param_name)
+                    if isinstance(param, Mapping) and param.get("autosize_allowed"):
+                        fixed_columns[column] = "Autosize"
+                    elif isinstance(param, Mapping):
+                        ranged_columns.append(column)
+                        lows.append(param["min_value"])
+                        highs.append(param["max_value"])
+                    else:
+                        fixed_columns[column] = param
+
+        index = buildings_df.index[positions]
+        frame = pd.DataFrame(index=index)
+        if ranged_columns:
+            counters = np.array([_column_counter(c) for c in ranged_columns], dtype=np.uint64)
+            lows = np.asarray(lows, dtype=np.float64)
+            highs = np.asarray(highs, dtype=np.float64)
+            values = lows + _uniforms(building_keys[positions], counters) * (highs - lows)
+            frame = pd.DataFrame(values, index=index, columns=ranged_columns)
+        for column, value in fixed_columns.items():
+            frame[column] = value
+        group_frames.append(frame)
 
-        merged_data.append(building_data)
+    if not group_frames:
+        return pd.DataFrame(index=buildings_df.index)
+    return pd.concat(group_frames).reindex(buildings_df.index)
 
-    merged_df = pd.DataFrame(merged_data)
-    return merged_df
+
+def preprocess_building_data(buildings_df, config_manager):
+    """
+    Preprocesses the building data and applies the configurations based on user selections and modifications.
+    
+    Returns buildings_df with one presampled column per envelope property (see sample_envelope_properties),
+    which update_construction_materials uses instead of sampling per building.
+    """
+    sampled_df = sample_envelope_properties(buildings_df, config_manager)
+    return pd.concat([buildings_df, sampled_df], axis=1)
 
 
 def map_roughness_value(numeric_value):
@@ -109,17 +267,29 @@ def map_roughness_value(numeric_value):
         return "VeryRough"
 
 
-def extract_value(param, config_manager):
+def sampled_value(building_row, object_name, param_name, params, default, config_manager, rng=None):
+    """
+    Returns the value presampled by preprocess_building_data for this property, or samples it
+    from the configuration parameters when the row has no such column.
+    """
+    value = building_row.get(envelope_column(object_name, param_name))
+    if value is not None and value == value:  # NaN when the property is not configured for this group
+        return value
+    return extract_value(params.get(param_name, default), config_manager, rng)
+
+
+def extract_value(param, config_manager, rng=None):
     """
     Extracts a specific value from the configuration parameters, potentially applying user-specified modifications.
+    Pass the building's rng (ConfigurationManager.building_rng) to make the sampled value reproducible.
     """
-    if isinstance(param, dict):
+    if isinstance(param, Mapping):
         min_val = param.get("min_value")
         max_val = param.get("max_value")
         if min_val is not None and max_val is not None:
             if "autosize_allowed" in param and param["autosize_allowed"]:
                 return "Autosize"
-            return config_manager.get_random_value(min_val, max_val)
+            return config_manager.get_random_value(min_val, max_val, rng)
         else:
             raise KeyError(f"Missing 'min_value' or 'max_value' in parameter configuration: {param}")
     return param
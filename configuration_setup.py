@@ -1,5 +1,15 @@
 # configuration_setup.py
+import hashlib
 import json
+import os
+
+from config import get_configuration_config
+
+# Bump when the layout of the data structure changes, so stale artifacts are rejected
+CONFIG_SCHEMA_VERSION = 1
+
+# Process-wide configuration, built or loaded on first use; see get_configuration()
+_configuration = {}
 
 def initialize_data_structure():
     return {
@@ -263,8 +273,60 @@ def setup_configurations():
 
     return data_structure
 
-# Running the configuration setup and displaying the result
-#config = setup_configurations()
-
-# Print the resulting data structure as a formatted JSON
-#print(json.dumps(config, indent=4))
\ No newline at end of file
+def config_checksum(data_structure):
+    """SHA-256 of the canonical (sorted, compact) JSON form of a configuration data structure."""
+    canonical = json.dumps(data_structure, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def save_configuration_artifact(path, data_structure=None):
+    """Writes the configuration as a compact, versioned JSON artifact and returns its checksum."""
+    if data_structure is None:
+        data_structure = setup_configurations()
+    checksum = config_checksum(data_structure)
+    artifact = {"schema_version": CONFIG_SCHEMA_VERSION, "checksum": checksum, "data": data_structure}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(artifact, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return checksum
+
+
+def load_configuration_artifact(path):
+    """Reads an artifact written by save_configuration_artifact; returns (data_structure, checksum)."""
+    with open(path) as f:
+        artifact = json.load(f)
+    if artifact.get("schema_version") != CONFIG_SCHEMA_VERSION:
+        raise ValueError(f"Configuration artifact {path} has schema version {artifact.get('schema_version')}, expected {CONFIG_SCHEMA_VERSION}")
+    data_structure = artifact["data"]
+    checksum = config_checksum(data_structure)
+    if checksum != artifact.get("checksum"):
+        raise ValueError(f"Configuration artifact {path} is corrupt: checksum mismatch")
+    return data_structure, checksum
+
+
+def get_configuration():
+    """
+    Returns (data_structure, checksum) for this process, building it only once.
+
+    The structure comes from the CONFIG_ARTIFACT file when one is configured and present, and
+    from setup_configurations() otherwise. It is shared by every request, so callers must treat
+    it as read-only (ConfigurationManager never writes to it).
+    """
+    if not _configuration:
+        artifact_path = get_configuration_config()['artifact_path']
+        if artifact_path and os.path.exists(artifact_path):
+            data_structure, checksum = load_configuration_artifact(artifact_path)
+            print(f"Configuration loaded from {artifact_path} (checksum {checksum[:12]})")
+        else:
+            data_structure = setup_configurations()
+            checksum = config_checksum(data_structure)
+        _configuration.update(data=data_structure, checksum=checksum)
+    return _configuration['data'], _configuration['checksum']
+
+
+# Build the artifact ahead of time: python configuration_setup.py /app/data/configuration.json
+if __name__ == '__main__':
+    import sys
+    artifact_path = sys.argv[1] if len(sys.argv) > 1 else get_configuration_config()['artifact_path']
+    print(f"Wrote {artifact_path} (checksum {save_configuration_artifact(artifact_path)})")
@@ -0,0 +1,245 @@
+# fake_energyplus.py
+# Stand-in for EnergyPlus (SIMULATOR=fake) so the scheduler, simulation cache and post-processing
+# can be load-tested on machines without an EnergyPlus installation.
+#
+# For every Output:Meter and Output:Variable in the IDF it writes a year of deterministic values
+# (seeded from the IDF file contents) to the same files a real run leaves behind: <prefix>.eso,
+# <prefix>.sql when Output:SQLite is requested, <prefix>.csv when readvars is set, and <prefix>.err.
+import calendar
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from config import get_fake_simulator_config
+from json_processor import CSV_FREQUENCY_LABELS, TIME_COLUMN
+from sql_reader import RUN_PERIOD_ENVIRONMENT, SQL_FREQUENCIES, format_time_label
+
+# Bumped whenever the generated outputs change, so cached fake outputs are not reused
+FAKE_VERSION = "fake-1"
+
+# IDF Reporting_Frequency values and the frequency the fake reports them at
+FREQUENCY_ALIASES = {"detailed": "timestep", "timestep": "timestep", "hourly": "hourly", "daily": "daily", "monthly": "monthly"}
+
+# Objects a wildcard ('*') key expands to, by the start of the variable name; anything else is per zone
+WILDCARD_OBJECTS = [
+    ("Site ", None),
+    ("Water Heater", "WATERHEATER:MIXED"),
+    ("Boiler", "BOILER:HOTWATER"),
+]
+# Meters a wildcard meter name such as Electricity:* expands to
+WILDCARD_METER_SUFFIXES = ["Facility", "Building", "HVAC", "Plant"]
+
+ESO_TIME_CODES = {"timestep": 2, "hourly": 2, "daily": 3, "monthly": 4}
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+CREATE_TABLES = (
+    """CREATE TABLE EnvironmentPeriods (
+        EnvironmentPeriodIndex INTEGER PRIMARY KEY, SimulationIndex INTEGER, EnvironmentName TEXT, EnvironmentType INTEGER)""",
+    """CREATE TABLE Time (
+        TimeIndex INTEGER PRIMARY KEY, Year INTEGER, Month INTEGER, Day INTEGER, Hour INTEGER, Minute INTEGER,
+        Dst INTEGER, Interval INTEGER, IntervalType INTEGER, SimulationDays INTEGER, DayType TEXT,
+        EnvironmentPeriodIndex INTEGER, WarmupFlag INTEGER)""",
+    """CREATE TABLE ReportDataDictionary (
+        ReportDataDictionaryIndex INTEGER PRIMARY KEY, IsMeter INTEGER, Type TEXT, IndexGroup TEXT, TimestepType TEXT,
+        KeyValue TEXT, Name TEXT, ReportingFrequency TEXT, ScheduleName TEXT, Units TEXT)""",
+    """CREATE TABLE ReportData (
+        ReportDataIndex INTEGER PRIMARY KEY, TimeIndex INTEGER, ReportDataDictionaryIndex INTEGER, Value REAL)""",
+)
+
+
+def units_for(name):
+    if name.endswith("Energy") or ":" in name:
+        return "J"
+    if "Temperature" in name:
+        return "C"
+    if "per Area" in name:
+        return "W/m2"
+    if "Angle" in name:
+        return "deg"
+    if name.endswith("Rate") or name.endswith("Power"):
+        return "W"
+    return ""
+
+
+def requested_series(idf):
+    """(key, name, units, frequency, is_meter) of every series the IDF's output requests produce."""
+    zones = [zone.Name.upper() for zone in idf.idfobjects['ZONE']]
+    series = []
+    for meter in idf.idfobjects['OUTPUT:METER']:
+        frequency = FREQUENCY_ALIASES.get(str(meter.Reporting_Frequency).lower())
+        if frequency is None:
+            continue
+        names = [meter.Key_Name.replace("*", suffix) for suffix in WILDCARD_METER_SUFFIXES] if "*" in meter.Key_Name else [meter.Key_Name]
+        series.extend(("", name, "J", frequency, True) for name in names)
+    for variable in idf.idfobjects['OUTPUT:VARIABLE']:
+        frequency = FREQUENCY_ALIASES.get(str(variable.Reporting_Frequency).lower())
+        if frequency is None:
+            continue
+        name = variable.Variable_Name.strip()
+        keys = [variable.Key_Value.upper()]
+        if variable.Key_Value == "*":
+            keys = zones
+            for prefix, object_type in WILDCARD_OBJECTS:
+                if name.startswith(prefix):
+                    keys = ["ENVIRONMENT"] if object_type is None else [obj.Name.upper() for obj in idf.idfobjects[object_type]]
+                    break
+        series.extend((key, name, units_for(name), frequency, False) for key in keys)
+    # The same series requested twice is reported once
+    return list(dict.fromkeys(series))
+
+
+def reporting_intervals(frequency, timesteps_per_hour):
+    """(month, day, hour, minute, day_of_simulation) arrays of the end of every interval in a non-leap year."""
+    days = np.arange(365)
+    dates = np.datetime64("2021-01-01") + days
+    months = dates.astype("datetime64[M]").astype(int) % 12 + 1
+    month_days = (dates - dates.astype("datetime64[M]")).astype(int) + 1
+    if frequency == "monthly":
+        last = np.array([calendar.monthrange(2021, m)[1] for m in range(1, 13)])
+        return np.arange(1, 13), last, np.full(12, 24), np.zeros(12, dtype=int), np.cumsum(last)
+    if frequency == "daily":
+        return months, month_days, np.full(365, 24), np.zeros(365, dtype=int), days + 1
+    per_hour = timesteps_per_hour if frequency == "timestep" else 1
+    per_day = 24 * per_hour
+    step = np.arange(365 * per_day)
+    day = step // per_day
+    minutes = (step % per_day + 1) * 60 // per_hour
+    return months[day], month_days[day], minutes // 60, minutes % 60, day + 1
+
+
+def series_values(seed, key, name, units, day_of_year, hour):
+    """A deterministic, plausibly shaped series: daily and seasonal cycles plus noise."""
+    digest = hashlib.sha256(f"{seed}:{key}:{name}".encode("utf-8")).digest()
+    rng = np.random.default_rng(int.from_bytes(digest[:8], "little"))
+    season = np.cos(2 * np.pi * (day_of_year - 15) / 365)
+    daily = np.sin(np.pi * np.clip(hour - 6, 0, 16) / 16)
+    if units == "C":
+        return 10 + 8 * -season + 4 * daily + rng.normal(0, 1, len(hour))
+    if units in ("deg", "W/m2"):
+        return np.maximum(0, rng.uniform(100, 400) * (0.6 - 0.4 * season) * daily)
+    scale = rng.uniform(1e5, 1e6)
+    return np.maximum(0, scale * (1 + 0.5 * season + 0.8 * daily + rng.normal(0, 0.1, len(hour))))
+
+
+def write_sql(path, intervals, data):
+    if os.path.exists(path):
+        os.remove(path)
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        for statement in CREATE_TABLES:
+            conn.execute(statement)
+        conn.execute("INSERT INTO EnvironmentPeriods VALUES (1, 1, 'RUN PERIOD 1', ?)", (RUN_PERIOD_ENVIRONMENT,))
+        time_offset, dictionary_index = 0, 0
+        for frequency, (month, day, hour, minute, sim_day) in intervals.items():
+            time_indexes = np.arange(time_offset + 1, time_offset + len(month) + 1)
+            conn.executemany(
+                "INSERT INTO Time VALUES (?, 2021, ?, ?, ?, ?, 0, NULL, NULL, ?, NULL, 1, 0)",
+                zip(time_indexes.tolist(), month.tolist(), day.tolist(), hour.tolist(), minute.tolist(), sim_day.tolist()),
+            )
+            for (key, name, units, is_meter), values in data[frequency].items():
+                dictionary_index += 1
+                conn.execute(
+                    "INSERT INTO ReportDataDictionary VALUES (?, ?, ?, NULL, NULL, ?, ?, ?, NULL, ?)",
+                    (dictionary_index, int(is_meter), "Sum" if units == "J" else "Avg", key, name, SQL_FREQUENCIES[frequency][0], units),
+                )
+                conn.executemany(
+                    "INSERT INTO ReportData (TimeIndex, ReportDataDictionaryIndex, Value) VALUES (?, ?, ?)",
+                    zip(time_indexes.tolist(), [dictionary_index] * len(values), values.tolist()),
+                )
+            time_offset += len(month)
+        conn.commit()
+
+
+def write_eso(path, intervals, data):
+    lines = ["Program Version,EnergyPlus, Version 22.2.0 (fake)",
+             "1,5,Environment Title[],Latitude[deg],Longitude[deg],Time Zone[],Elevation[m]",
+             "2,8,Day of Simulation[],Month[],Day of Month[],DST Indicator[1=yes 0=no],Hour[],StartMinute[],EndMinute[],DayType",
+             "3,5,Cumulative Day of Simulation[],Month[],Day of Month[],DST Indicator[1=yes 0=no],DayType  ! When Daily Report Variables Requested",
+             "4,2,Cumulative Days of Simulation[],Month[]  ! When Monthly Report Variables Requested"]
+    report_id = 6
+    blocks = []
+    for frequency in intervals:
+        ids = []
+        for key, name, units, is_meter in data[frequency]:
+            label = CSV_FREQUENCY_LABELS[frequency]
+            lines.append(f"{report_id},1,{name} [{units}] !{label}" if is_meter else f"{report_id},1,{key},{name} [{units}] !{label}")
+            ids.append(report_id)
+            report_id += 1
+        blocks.append((frequency, ids))
+    lines.append("End of Data Dictionary")
+    lines.append("1,RUN PERIOD 1,  52.30,   4.77,   1.00,  -2.00")
+
+    for frequency, ids in blocks:
+        month, day, hour, minute, sim_day = intervals[frequency]
+        columns = [values.tolist() for values in data[frequency].values()]
+        code = ESO_TIME_CODES[frequency]
+        interval_minutes = 60 * 8760 // len(month) if code == 2 else 0
+        for i in range(len(month)):
+            day_name = DAY_NAMES[(sim_day[i] + 3) % 7]  # 2021-01-01 is a Friday
+            if code == 2:
+                # The ESO numbers hours from 1 and gives the start and end minute within that hour
+                eso_hour, end_minute = (hour[i], 60) if minute[i] == 0 else (hour[i] + 1, minute[i])
+                lines.append(f"2,{sim_day[i]},{month[i]},{day[i]},0,{eso_hour},{end_minute - interval_minutes:.2f},{end_minute:.2f},{day_name}")
+            elif code == 3:
+                lines.append(f"3,{sim_day[i]},{month[i]},{day[i]},0,{day_name}")
+            else:
+                lines.append(f"4,{sim_day[i]},{month[i]}")
+            lines.extend(f"{index},{column[i]!r}" for index, column in zip(ids, columns))
+    lines.append("End of Data")
+    lines.append(f" Number of Records Written={sum(len(intervals[f][0]) * len(ids) for f, ids in blocks):>12}")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def write_csv(path, frequency, intervals, data):
+    """ReadVarsESO-style CSV of the series reported at frequency (the run's reporting frequency)."""
+    month, day, hour, minute, _ = intervals[frequency]
+    label = CSV_FREQUENCY_LABELS[frequency]
+    columns = {TIME_COLUMN: [format_time_label(*values, reporting_frequency=frequency)
+                             for values in zip(month.tolist(), day.tolist(), hour.tolist(), minute.tolist())]}
+    for (key, name, units, is_meter), values in data[frequency].items():
+        columns[f"{name} [{units}]({label})" if is_meter else f"{key}:{name} [{units}]({label})"] = values
+    pd.DataFrame(columns).to_csv(path, index=False)
+
+
+def run(idf, idf_path, epwfile, options):
+    """Writes fake outputs for idf under options['output_directory'] / options['output_prefix']."""
+    config = get_fake_simulator_config()
+    with open(idf_path, "rb") as f:
+        seed = hashlib.sha256(f.read()).hexdigest()
+    rng = np.random.default_rng(int(seed[:16], 16))
+    time.sleep(max(0.0, config['latency_seconds'] + config['latency_jitter'] * rng.uniform(-1, 1)))
+
+    output_dir, prefix = options['output_directory'], options['output_prefix']
+    err_path = os.path.join(output_dir, f"{prefix}.err")
+    if rng.random() < config['failure_rate']:
+        with open(err_path, "w") as f:
+            f.write("   ** Severe  ** Fake EnergyPlus failure\n   **  Fatal  ** Program terminates\n")
+        raise RuntimeError(f"Fake EnergyPlus run failed for {idf_path}; see {err_path}")
+
+    timesteps = idf.idfobjects['TIMESTEP']
+    timesteps_per_hour = int(timesteps[0].Number_of_Timesteps_per_Hour) if timesteps else 6
+    series = requested_series(idf)
+    frequencies = [frequency for frequency in FREQUENCY_ALIASES.values() if any(s[3] == frequency for s in series)]
+    intervals = {frequency: reporting_intervals(frequency, timesteps_per_hour) for frequency in dict.fromkeys(frequencies)}
+    data = {frequency: {} for frequency in intervals}
+    for key, name, units, frequency, is_meter in series:
+        _, _, hour, minute, sim_day = intervals[frequency]
+        data[frequency][(key, name, units, is_meter)] = series_values(seed, key, name, units, sim_day, hour + minute / 60)
+
+    write_eso(os.path.join(output_dir, f"{prefix}.eso"), intervals, data)
+    if idf.idfobjects['OUTPUT:SQLITE']:
+        write_sql(os.path.join(output_dir, f"{prefix}.sql"), intervals, data)
+    if options.get('readvars'):
+        # The CSV holds the series at the reporting frequency of the facility electricity meter
+        main = next((s[3] for s in series if s[1] == "Electricity:Facility"), frequencies[0] if frequencies else None)
+        if main:
+            write_csv(os.path.join(output_dir, f"{prefix}.csv"), main, intervals, data)
+    with open(err_path, "w") as f:
+        f.write("Program Version,EnergyPlus, Version 22.2.0 (fake)\n   ************* EnergyPlus Completed Successfully.\n")
@@ -0,0 +1,53 @@
+# fidelity_profiles.py
+
+# EnergyPlus settings that dominate simulation runtime, per profile. standard is what every
+# generated IDF used before profiles existed (Minimal.idf's 4 timesteps per hour).
+# fast is for city-scale screening runs, detailed for final reports.
+FIDELITY_PROFILES = {
+    "fast": {
+        "timesteps_per_hour": 2,
+        "min_warmup_days": 1,
+        "max_warmup_days": 25,
+        "solar_distribution": "MinimalShadowing",
+        "loads_convergence": 0.1,
+        "temperature_convergence": 0.5,
+    },
+    "standard": {
+        "timesteps_per_hour": 4,
+        "min_warmup_days": 1,
+        "max_warmup_days": 150,
+        "solar_distribution": "FullExterior",
+        "loads_convergence": 0.04,
+        "temperature_convergence": 0.4,
+    },
+    "detailed": {
+        "timesteps_per_hour": 6,
+        "min_warmup_days": 6,
+        "max_warmup_days": 150,
+        "solar_distribution": "FullInteriorAndExteriorWithReflections",
+        "loads_convergence": 0.02,
+        "temperature_convergence": 0.2,
+    },
+}
+
+DEFAULT_FIDELITY_PROFILE = "standard"
+
+
+def apply_fidelity_profile(idf, profile):
+    """Sets the Building and Timestep objects of idf to the named profile's settings."""
+    if profile not in FIDELITY_PROFILES:
+        raise ValueError(f"Unknown fidelity profile {profile!r}; expected one of {', '.join(FIDELITY_PROFILES)}")
+    spec = FIDELITY_PROFILES[profile]
+
+    for building in idf.idfobjects["BUILDING"]:
+        building.Loads_Convergence_Tolerance_Value = spec["loads_convergence"]
+        building.Temperature_Convergence_Tolerance_Value = spec["temperature_convergence"]
+        building.Solar_Distribution = spec["solar_distribution"]
+        building.Maximum_Number_of_Warmup_Days = spec["max_warmup_days"]
+        building.Minimum_Number_of_Warmup_Days = spec["min_warmup_days"]
+
+    timesteps = idf.idfobjects["TIMESTEP"]
+    if timesteps:
+        timesteps[0].Number_of_Timesteps_per_Hour = spec["timesteps_per_hour"]
+    else:
+        idf.newidfobject("TIMESTEP", Number_of_Timesteps_per_Hour=spec["timesteps_per_hour"])
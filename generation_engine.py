@@ -0,0 +1,178 @@
+# generation_engine.py
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from config import get_generation_config
+from fidelity_profiles import apply_fidelity_profile
+from idf_fragments import save_idf
+from idf_registry import IDFRegistry
+from idf_template import get_template, load_base_idf
+from metrics import current_rss_bytes
+from timing import SpanTimer
+from idf_operations import (
+    update_construction_materials,
+    add_ground_temperatures,
+    add_water_heating,
+    add_v2_fan_natural_ventilation,
+    remove_building_object,
+    create_building_block,
+    update_idf_for_fenestration,
+    assign_constructions_to_surfaces,
+    add_internal_mass_to_all_zones_with_first_construction,
+    add_lights_to_all_zones,
+    generate_detailed_electric_equipment,
+    add_year_long_run_period,
+    add_outdoor_air_and_zone_sizing_to_all_zones,
+    add_door_to_wall,
+    add_hvac_schedules,
+    add_H2_RadiantConvective_heating,
+    setup_combined_hvac_equipment_V2_H2_2,
+    check_and_add_idfobject,
+    add_people_and_activity_schedules
+)
+
+# Per-process state set by the pool initializer, so config_manager is pickled once per worker
+_worker_state = {}
+
+
+# Function to process each building and update IDF files
+def process_building(row, base_idf_path, idd_path, output_dir, config_manager, timer=None):
+    # Each step is timed as its own stage; pass a SpanTimer to collect the spans
+    timer = timer or SpanTimer()
+
+    # Copy the base IDF from the per-process template instead of re-parsing it; the builders
+    # look objects up by name, zone and surface type through the registry's indexes
+    idf = IDFRegistry(timer.call(load_base_idf, base_idf_path, idd_path))
+
+    building_id = row['nummeraanduiding_id']
+    print(f"Processing building ID {building_id}...")
+
+    # Apply modifications using the refactored functions
+    timer.call(remove_building_object, idf)
+    timer.call(create_building_block, idf, row, config_manager.geometry, config_manager.zone_multipliers)
+    timer.call(apply_fidelity_profile, idf, config_manager.fidelity)
+    timer.call(update_construction_materials, idf, row, config_manager)
+    timer.call(update_idf_for_fenestration, idf, row)
+    timer.call(assign_constructions_to_surfaces, idf)
+    timer.call(add_ground_temperatures, idf, config_manager)
+    timer.call(add_internal_mass_to_all_zones_with_first_construction, idf, row)
+    timer.call(add_people_and_activity_schedules, idf, row)
+    timer.call(add_lights_to_all_zones, idf, row)
+    timer.call(generate_detailed_electric_equipment, idf, row)
+    timer.call(add_year_long_run_period, idf)
+    timer.call(add_outdoor_air_and_zone_sizing_to_all_zones, idf)
+    timer.call(add_door_to_wall, idf)
+    timer.call(add_hvac_schedules, idf, row)
+    timer.call(add_water_heating, idf)
+    timer.call(add_v2_fan_natural_ventilation, idf)
+    timer.call(add_H2_RadiantConvective_heating, idf)
+    timer.call(setup_combined_hvac_equipment_V2_H2_2, idf)
+    timer.call(check_and_add_idfobject, idf, config_manager.reporting_frequency)
+
+    # Save the modified IDF file with a unique name
+    modified_idf_filename = f"modified_building_{building_id}.idf"
+    modified_idf_path = os.path.join(output_dir, modified_idf_filename)
+    # Static HVAC/DHW/schedule blocks are spliced in as text rendered once per process
+    timer.call(save_idf, idf, modified_idf_path)
+
+    print(f"Saved modified IDF for building {building_id} at {modified_idf_path}")
+    return modified_idf_path
+
+
+def _init_worker(base_idf_path, idd_path, output_dir, config_manager):
+    """Pool initializer: set this worker's IDD and parse its base IDF template once."""
+    _worker_state.update(
+        base_idf_path=base_idf_path,
+        idd_path=idd_path,
+        output_dir=output_dir,
+        config_manager=config_manager,
+    )
+    get_template(base_idf_path, idd_path)
+
+
+def process_rows(rows):
+    """
+    Generate every building in a chunk, returning one result per row instead of raising.
+    Each result carries the building's timing spans: one per generation step plus 'generate'.
+    """
+    results = []
+    for row in rows:
+        building_id = row.get('nummeraanduiding_id')
+        timer = SpanTimer()
+        try:
+            with timer.span("generate"):
+                idf_path = process_building(
+                    row,
+                    _worker_state['base_idf_path'],
+                    _worker_state['idd_path'],
+                    _worker_state['output_dir'],
+                    _worker_state['config_manager'],
+                    timer,
+                )
+            results.append({"building_id": building_id, "status": "success", "idf_path": idf_path, "error": None, "spans": timer.spans,
+                            "pid": os.getpid(), "rss_bytes": current_rss_bytes()})
+        except Exception as e:
+            results.append({
+                "building_id": building_id,
+                "status": "failed",
+                "idf_path": None,
+                "error": f"{type(e).__name__}: {e}",
+                "traceback": traceback.format_exc(),
+                "spans": timer.spans,
+                "pid": os.getpid(),
+                "rss_bytes": current_rss_bytes(),
+            })
+    return results
+
+
+def chunk_rows(buildings_df, chunk_size):
+    """Split a DataFrame into lists of plain dict rows, which pickle far cheaper than Series."""
+    records = buildings_df.to_dict('records')
+    return [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+
+
+def make_generation_pool(num_workers, base_idf_path, idd_path, output_dir, config_manager):
+    """Create a process pool whose workers are warmed up for generating into output_dir."""
+    return ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=_init_worker,
+        initargs=(base_idf_path, idd_path, output_dir, config_manager),
+    )
+
+
+def failed_chunk_results(rows, error):
+    """Results for a chunk whose worker died before returning anything."""
+    return [
+        {"building_id": row.get('nummeraanduiding_id'), "status": "failed", "idf_path": None,
+         "error": f"{type(error).__name__}: {error}"}
+        for row in rows
+    ]
+
+
+def iter_generate(buildings_df, output_dir, base_idf_path, idd_path, config_manager, num_workers=None, chunk_size=None):
+    """Generate IDFs in a process pool and yield one result dict per building as chunks finish."""
+    generation_config = get_generation_config()
+    num_workers = num_workers or generation_config['num_workers']
+    chunk_size = chunk_size or generation_config['chunk_size']
+
+    os.makedirs(output_dir, exist_ok=True)
+    chunks = chunk_rows(buildings_df, chunk_size)
+    if not chunks:
+        return
+
+    with make_generation_pool(min(num_workers, len(chunks)), base_idf_path, idd_path, output_dir, config_manager) as executor:
+        futures = {executor.submit(process_rows, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. BrokenProcessPool); fail the whole chunk
+                results = failed_chunk_results(futures[future], e)
+            for result in results:
+                yield result
+
+
+def generate_idfs(buildings_df, output_dir, base_idf_path, idd_path, config_manager, num_workers=None, chunk_size=None):
+    """Generate IDFs for all buildings and return the per-building results."""
+    return list(iter_generate(buildings_df, output_dir, base_idf_path, idd_path, config_manager, num_workers, chunk_size))
@@ -0,0 +1,45 @@
+# idf_fragments.py
+from io import StringIO
+
+from geomeppy import IDF
+
+# Building-independent IDF blocks rendered to text, one per fragment key in this process
+_fragments = {}
+
+
+def render_fragment(key, build, *args):
+    """Return the IDF text of the objects build(idf, *args) adds to an empty IDF, building them only on first use."""
+    text = _fragments.get(key)
+    if text is None:
+        # The IDD is already set on the IDF class by the base template
+        scratch = IDF(StringIO(""))
+        build(scratch, *args)
+        # Without field comments eppy skips its per-field IDD lookups, which dominate idf.save
+        scratch.outputtype = "nocomment"
+        text = scratch.idfstr()
+        _fragments[key] = text
+    return text
+
+
+def add_fragment(idf, key, build, *args):
+    """
+    Add a static block to a building's IDF as pre-rendered text instead of as objects.
+
+    The text is written after the IDF's own objects by save_idf, so none of the block's objects
+    are visible through idf.idfobjects before the file is saved.
+    """
+    if not hasattr(idf, "static_fragments"):
+        idf.static_fragments = {}
+    idf.static_fragments[key] = render_fragment(key, build, *args)
+
+
+def save_idf(idf, path):
+    """Save the IDF like idf.save, followed by the fragments added to it."""
+    text = idf.idfstr() + "".join(getattr(idf, "static_fragments", {}).values())
+    with open(path, "w", encoding="latin-1") as f:
+        f.write(text)
+
+
+def clear_fragments():
+    """Drop all rendered fragments, e.g. after the builders have changed in a long-running process."""
+    _fragments.clear()
@@ -1,5 +1,15 @@
-from config_manager import extract_value, map_roughness_value  # Import extract_value function
-from geomeppy import IDF
+from config_manager import extract_value, sampled_value, map_roughness_value  # Import extract_value function
+from block_geometry import add_rectangular_block, add_windows, is_rectangle, match_stacked_surfaces
+from idf_fragments import add_fragment
+
+# Output objects whose Reporting_Frequency follows the run's reporting frequency
+OUTPUT_FREQUENCY_OBJECTS = [
+    "OUTPUT:VARIABLE",
+    "OUTPUT:METER",
+    "OUTPUT:METER:METERFILEONLY",
+    "OUTPUT:METER:CUMULATIVE",
+    "OUTPUT:METER:CUMULATIVE:METERFILEONLY",
+]
 
 
 
@@ -18,7 +28,7 @@ def remove_building_object(idf):
 ################################################################                idf.save()
 
 # Define a function to create a new building block in the IDF
-def create_building_block(idf, building_row):
+def create_building_block(idf, building_row, geometry="analytic", zone_multipliers=False):
     """Create a building block in the IDF based on DataFrame row information."""
     perimeter = building_row['perimeter']
     area = building_row['area']
@@ -48,12 +58,18 @@ def create_building_block(idf, building_row):
     idf.newidfobject("BUILDING", 
                      Name="New Building Block", 
                      North_Axis=orientation,
-                     Terrain="Suburbs",                      # Assuming suburban terrain
-                     Loads_Convergence_Tolerance_Value=0.04,  # Default values for convergence
-                     Temperature_Convergence_Tolerance_Value=0.4,
-                     Solar_Distribution="FullExterior",      # Default solar distribution
-                     Maximum_Number_of_Warmup_Days=150,       # Set maximum warmup days to 50
-                     Minimum_Number_of_Warmup_Days=1)        # Set minimum warmup days to 1
+                     Terrain="Suburbs")                      # Assuming suburban terrain
+    # Convergence, solar distribution and warmup come from the job's fidelity profile
+    # (fidelity_profiles.apply_fidelity_profile)
+
+    # Rectangular footprints are built in closed form with ceilings and floors already matched;
+    # other footprints go through geomeppy, and intersect_match and match_stacked_surfaces in
+    # update_idf_for_fenestration
+    if geometry == "analytic" and num_stories >= 1 and is_rectangle(coordinates):
+        idf.exterior_walls = add_rectangular_block(idf, 'BuildingBlock1', coordinates, facade_height, num_stories, zone_multipliers)
+        return
+    if zone_multipliers:
+        print("Zone multipliers need a rectangular block built in closed form; modelling every storey")
 
     # Add the building block to the IDF with the given parameters
     idf.add_block(name='BuildingBlock1', 
@@ -74,48 +90,51 @@ def update_construction_materials(idf, building_row, config_manager):
     building_type = building_row["building_type"]
     age_range = building_row["age_range"]
     niveau = config_manager.get_niveau(function, building_type, age_range)
+    # Values presampled by preprocess_building_data are used as-is; anything missing is sampled
+    # here from this building's own seeded stream so the generated IDF is reproducible
+    rng = config_manager.building_rng(building_row['nummeraanduiding_id'])
 
     # Process Groundfloor
     groundfloor_params = config_manager.get_parameter_values(function, building_type, age_range, niveau, object_group="envelop parameters", object_type="material", object_name="groundfloor")
     idf.newidfobject('MATERIAL', Name='Groundfloor', 
-                     Roughness=map_roughness_value(extract_value(groundfloor_params.get("roughness", 0.7), config_manager)),
-                     Thickness=extract_value(groundfloor_params.get("thickness", 0.15), config_manager),  
-                     Conductivity=extract_value(groundfloor_params.get("thermal conductivity", 1.4), config_manager),  
-                     Density=extract_value(groundfloor_params.get("density", 2300), config_manager),  
-                     Specific_Heat=extract_value(groundfloor_params.get("specific heat", 1000), config_manager))
+                     Roughness=map_roughness_value(sampled_value(building_row, "groundfloor", "roughness", groundfloor_params, 0.7, config_manager, rng)),
+                     Thickness=sampled_value(building_row, "groundfloor", "thickness", groundfloor_params, 0.15, config_manager, rng),  
+                     Conductivity=sampled_value(building_row, "groundfloor", "thermal conductivity", groundfloor_params, 1.4, config_manager, rng),  
+                     Density=sampled_value(building_row, "groundfloor", "density", groundfloor_params, 2300, config_manager, rng),  
+                     Specific_Heat=sampled_value(building_row, "groundfloor", "specific heat", groundfloor_params, 1000, config_manager, rng))
 
     # Process External Walls
     ext_walls_params = config_manager.get_parameter_values(function, building_type, age_range, niveau, object_group="envelop parameters", object_type="material", object_name="ext_walls")
     idf.newidfobject('MATERIAL', Name='Ext_Walls', 
-                     Roughness=map_roughness_value(extract_value(ext_walls_params.get("surface roughness", 0.7), config_manager)),
-                     Thickness=extract_value(ext_walls_params.get("thickness", 0.2), config_manager),  
-                     Conductivity=extract_value(ext_walls_params.get("thermal conductivity", 1.4), config_manager),  
-                     Density=extract_value(ext_walls_params.get("density", 2300), config_manager),  
-                     Specific_Heat=extract_value(ext_walls_params.get("specific heat", 1000), config_manager))
+                     Roughness=map_roughness_value(sampled_value(building_row, "ext_walls", "surface roughness", ext_walls_params, 0.7, config_manager, rng)),
+                     Thickness=sampled_value(building_row, "ext_walls", "thickness", ext_walls_params, 0.2, config_manager, rng),  
+                     Conductivity=sampled_value(building_row, "ext_walls", "thermal conductivity", ext_walls_params, 1.4, config_manager, rng),  
+                     Density=sampled_value(building_row, "ext_walls", "density", ext_walls_params, 2300, config_manager, rng),  
+                     Specific_Heat=sampled_value(building_row, "ext_walls", "specific heat", ext_walls_params, 1000, config_manager, rng))
 
     # Process Roof
     roof_params = config_manager.get_parameter_values(function, building_type, age_range, niveau, object_group="envelop parameters", object_type="material:nomass", object_name="roof")
     idf.newidfobject('MATERIAL:NOMASS', Name='Roof', 
-                     Thermal_Resistance=extract_value(roof_params.get("thermal resistance", 0.2), config_manager),
+                     Thermal_Resistance=sampled_value(building_row, "roof", "thermal resistance", roof_params, 0.2, config_manager, rng),
                      Roughness='MediumRough')
 
     # Process Windows
     windows_params = config_manager.get_parameter_values(function, building_type, age_range, niveau, object_group="envelop parameters", object_type="windowmaterial:simpleglazingsystem", object_name="windows")
     idf.newidfobject("WINDOWMATERIAL:SIMPLEGLAZINGSYSTEM", 
                      Name='Windowglass', 
-                     UFactor=extract_value(windows_params.get("u_factor", 2.0), config_manager), 
+                     UFactor=sampled_value(building_row, "windows", "u_factor", windows_params, 2.0, config_manager, rng), 
                      Solar_Heat_Gain_Coefficient=0.7)
 
     # Process Internal Walls
     int_walls_params = config_manager.get_parameter_values(function, building_type, age_range, niveau, object_group="envelop parameters", object_type="material:nomass", object_name="int_walls")
     idf.newidfobject('MATERIAL:NOMASS', Name='Int_Walls', 
-                     Thermal_Resistance=extract_value(int_walls_params.get("thermal resistance", 0.2), config_manager), 
+                     Thermal_Resistance=sampled_value(building_row, "int_walls", "thermal resistance", int_walls_params, 0.2, config_manager, rng), 
                      Roughness='MediumRough')
 
     # Process Internal Floors/Ceilings
     int_floors_params = config_manager.get_parameter_values(function, building_type, age_range, niveau, object_group="envelop parameters", object_type="material:nomass", object_name="int_floors")
     idf.newidfobject('MATERIAL:NOMASS', Name='Int_Floors', 
-                     Thermal_Resistance=extract_value(int_floors_params.get("thermal resistance", 0.2), config_manager), 
+                     Thermal_Resistance=sampled_value(building_row, "int_floors", "thermal resistance", int_floors_params, 0.2, config_manager, rng), 
                      Roughness='MediumRough')
 
 
@@ -138,18 +157,26 @@ def update_construction_materials(idf, building_row, config_manager):
 # # Define Fenestration and Façade
 
 def update_idf_for_fenestration(idf, building_row):
+    # Walls of a block built by create_building_block in closed form, if it was
+    exterior_walls = getattr(idf, "exterior_walls", None)
+
     # Step 1: Correct the geometry intersections for better accuracy in simulations.
-    IDF.intersect_match(idf)
+    if exterior_walls is None:
+        idf.intersect_match()
+        match_stacked_surfaces(idf)
     
     # Step 2: Clear existing fenestration details to start fresh.
-    fenestrations = idf.idfobjects['FENESTRATIONSURFACE:DETAILED']
-    del fenestrations[:]
+    for fenestration in list(idf.idfobjects['FENESTRATIONSURFACE:DETAILED']):
+        idf.removeidfobject(fenestration)
     
     # Step 3: Set the new window-to-wall ratio (WWR).
 
     wwr =  building_row.get('average_wwr', .2)
 
-    IDF.set_wwr(idf, wwr=wwr, force=True, construction='Window1C')
+    if exterior_walls is not None:
+        add_windows(idf, exterior_walls, wwr, 'Window1C')
+    else:
+        idf.set_wwr(wwr=wwr, force=True, construction='Window1C')
     
     
 # idf.intersect_match()
@@ -258,9 +285,11 @@ def add_internal_mass_to_all_zones_with_first_construction(idf, building_row):
 
 
 def add_people_and_activity_schedules(idf, building_row):
+    building_function = building_row.get('function', 'Residential')  # Default to "Woon- en Verblijfsfuncties"  # Checks
+    add_fragment(idf, ("people_and_activity_schedules", building_function), people_and_activity_schedules_fragment, building_function)
 
 
-    building_function = building_row.get('function', 'Residential')  # Default to "Woon- en Verblijfsfuncties"  # Checks
+def people_and_activity_schedules_fragment(idf, building_function):
 
     idf.newidfobject(
         "SCHEDULETYPELIMITS",
@@ -699,7 +728,7 @@ def add_door_to_wall(idf):
     )
 
     # Find a suitable wall to place the door
-    walls = [wall for wall in idf.idfobjects['BUILDINGSURFACE:DETAILED'] if wall.Surface_Type.upper() == 'WALL' and wall.Outside_Boundary_Condition.upper() == 'OUTDOORS']
+    walls = [wall for wall in idf.surfaces_of_type('WALL') if wall.Outside_Boundary_Condition.upper() == 'OUTDOORS']
     
     if walls:
         # For simplicity, we choose the first exterior wall
@@ -740,10 +769,11 @@ def add_door_to_wall(idf):
 
 
 def add_hvac_schedules(idf, building_row):
-          
+     building_function = building_row['function'] #, 'Residential')  # Default to "Woon- en Verblijfsfuncties"  # Checks
+     add_fragment(idf, ("hvac_schedules", building_function), hvac_schedules_fragment, building_function)
 
 
-     building_function = building_row['function'] #, 'Residential')  # Default to "Woon- en Verblijfsfuncties"  # Checks
+def hvac_schedules_fragment(idf, building_function):
 
      idf.newidfobject(
           "SCHEDULETYPELIMITS",
@@ -1201,7 +1231,94 @@ def add_hvac_schedules(idf, building_row):
 
 
 def add_water_heating(idf):
+    add_fragment(idf, "water_heating_plant", water_heating_plant_fragment)
 
+    demand_branches = []
+    # Define WaterUse:Connections and WaterUse:Equipment objects for each zone
+    for i, zone in enumerate(idf.idfobjects['ZONE']):
+        # Unique identifiers for each zone's components
+        water_use_connections_name = f"{zone.Name}_WaterUse_Connections"
+        water_use_equipment_name = f"{zone.Name}_WaterUse_Equipment"
+        branch_name = f"SHWSys1_Demand_Load_Branch_{i+1}"
+
+        # Define WaterUse:Connections object for each zone
+        idf.newidfobject("WATERUSE:CONNECTIONS",
+            Name=water_use_connections_name,
+            Inlet_Node_Name=f"{zone.Name}_Water_Inlet_Node",
+            Outlet_Node_Name=f"{zone.Name}_Water_Outlet_Node",
+            Water_Use_Equipment_1_Name=water_use_equipment_name
+        )
+
+        # Define WaterUse:Equipment object for each zone
+        idf.newidfobject("WATERUSE:EQUIPMENT",
+            Name=water_use_equipment_name,
+            EndUse_Subcategory="SHW_Default",
+            Peak_Flow_Rate=2.77777777777778E-6,
+            Flow_Rate_Fraction_Schedule_Name="BLDG_SWH_SCH",
+            Target_Temperature_Schedule_Name="ZN_1_FLR_1_SEC_1SHW_DEFAULT Temp Sched",
+            Hot_Water_Supply_Temperature_Schedule_Name="ZN_1_FLR_1_SEC_1SHW_DEFAULTHot Supply Temp Sched",
+            Cold_Water_Supply_Temperature_Schedule_Name="",
+            Zone_Name=zone.Name,
+            Sensible_Fraction_Schedule_Name="ZN_1_FLR_1_SEC_1SHW_DEFAULT Sensible fract sched",
+            Latent_Fraction_Schedule_Name="ZN_1_FLR_1_SEC_1SHW_DEFAULT Latent fract sched"
+        )
+
+        # Define Branch object for each zone
+        idf.newidfobject("BRANCH",
+            Name=branch_name,
+            Component_1_Object_Type="WaterUse:Connections",
+            Component_1_Name=water_use_connections_name,
+            Component_1_Inlet_Node_Name=f"{zone.Name}_Water_Inlet_Node",
+            Component_1_Outlet_Node_Name=f"{zone.Name}_Water_Outlet_Node"
+        )
+
+        # Collect demand branch names
+        demand_branches.append(branch_name)
+    
+
+    # Prepare the list of branches in the required format for BRANCHLIST
+    branch_list_fields = {
+        "Branch_1_Name": "SHWSys1_Demand_Inlet_Branch",
+        **{f"Branch_{i+2}_Name": name for i, name in enumerate(demand_branches)},
+        f"Branch_{len(demand_branches) + 2}_Name": "SHWSys1_Demand_Bypass_Branch",
+        f"Branch_{len(demand_branches) + 3}_Name": "SHWSys1_Demand_Outlet_Branch"
+    }
+
+    # Add BranchList for demand branches
+    idf.newidfobject("BRANCHLIST",
+        Name="SHWSys1_Demand_Branches",
+        **branch_list_fields
+    )
+
+    # Prepare the list of branches in the required format for CONNECTOR:SPLITTER
+    splitter_fields = {
+        "Inlet_Branch_Name": "SHWSys1_Demand_Inlet_Branch",
+        **{f"Outlet_Branch_{i+1}_Name": name for i, name in enumerate(demand_branches)},
+        f"Outlet_Branch_{len(demand_branches) + 1}_Name": "SHWSys1_Demand_Bypass_Branch"
+    }
+
+    # Add Connector:Splitter for demand branches
+    idf.newidfobject("CONNECTOR:SPLITTER",
+        Name="SHWSys1_Demand_Splitter",
+        **splitter_fields
+    )
+
+
+    # Prepare the list of branches in the required format for CONNECTOR:MIXER
+    mixer_fields = {
+        "Outlet_Branch_Name": "SHWSys1_Demand_Outlet_Branch",
+        **{f"Inlet_Branch_{i+1}_Name": name for i, name in enumerate(demand_branches)},
+        f"Inlet_Branch_{len(demand_branches) + 1}_Name": "SHWSys1_Demand_Bypass_Branch"
+    }
+
+    # Add Connector:Mixer for demand branches
+    idf.newidfobject("CONNECTOR:MIXER",
+        Name="SHWSys1_Demand_Mixer",
+        **mixer_fields
+    )
+
+
+def water_heating_plant_fragment(idf):
     # Add Schedule:Compact objects
     idf.newidfobject("SCHEDULE:COMPACT",
         Name="ZN_1_FLR_1_SEC_1SHW_DEFAULT Latent fract sched",
@@ -1579,150 +1696,8 @@ def add_water_heating(idf):
         Outlet_Node_Name="SHWSys1_Demand_Outlet_Node"
     )
 
-
-    demand_branches = []
-    # Define WaterUse:Connections and WaterUse:Equipment objects for each zone
-    for i, zone in enumerate(idf.idfobjects['ZONE']):
-        # Unique identifiers for each zone's components
-        water_use_connections_name = f"{zone.Name}_WaterUse_Connections"
-        water_use_equipment_name = f"{zone.Name}_WaterUse_Equipment"
-        branch_name = f"SHWSys1_Demand_Load_Branch_{i+1}"
-
-        # Define WaterUse:Connections object for each zone
-        idf.newidfobject("WATERUSE:CONNECTIONS",
-            Name=water_use_connections_name,
-            Inlet_Node_Name=f"{zone.Name}_Water_Inlet_Node",
-            Outlet_Node_Name=f"{zone.Name}_Water_Outlet_Node",
-            Water_Use_Equipment_1_Name=water_use_equipment_name
-        )
-
-        # Define WaterUse:Equipment object for each zone
-        idf.newidfobject("WATERUSE:EQUIPMENT",
-            Name=water_use_equipment_name,
-            EndUse_Subcategory="SHW_Default",
-            Peak_Flow_Rate=2.77777777777778E-6,
-            Flow_Rate_Fraction_Schedule_Name="BLDG_SWH_SCH",
-            Target_Temperature_Schedule_Name="ZN_1_FLR_1_SEC_1SHW_DEFAULT Temp Sched",
-            Hot_Water_Supply_Temperature_Schedule_Name="ZN_1_FLR_1_SEC_1SHW_DEFAULTHot Supply Temp Sched",
-            Cold_Water_Supply_Temperature_Schedule_Name="",
-            Zone_Name=zone.Name,
-            Sensible_Fraction_Schedule_Name="ZN_1_FLR_1_SEC_1SHW_DEFAULT Sensible fract sched",
-            Latent_Fraction_Schedule_Name="ZN_1_FLR_1_SEC_1SHW_DEFAULT Latent fract sched"
-        )
-
-        # Define Branch object for each zone
-        idf.newidfobject("BRANCH",
-            Name=branch_name,
-            Component_1_Object_Type="WaterUse:Connections",
-            Component_1_Name=water_use_connections_name,
-            Component_1_Inlet_Node_Name=f"{zone.Name}_Water_Inlet_Node",
-            Component_1_Outlet_Node_Name=f"{zone.Name}_Water_Outlet_Node"
-        )
-
-        # Collect demand branch names
-        demand_branches.append(branch_name)
-    
-
-    # Prepare the list of branches in the required format for BRANCHLIST
-    branch_list_fields = {
-        "Branch_1_Name": "SHWSys1_Demand_Inlet_Branch",
-        **{f"Branch_{i+2}_Name": name for i, name in enumerate(demand_branches)},
-        f"Branch_{len(demand_branches) + 2}_Name": "SHWSys1_Demand_Bypass_Branch",
-        f"Branch_{len(demand_branches) + 3}_Name": "SHWSys1_Demand_Outlet_Branch"
-    }
-
-    # Add BranchList for demand branches
-    idf.newidfobject("BRANCHLIST",
-        Name="SHWSys1_Demand_Branches",
-        **branch_list_fields
-    )
-
-    # Prepare the list of branches in the required format for CONNECTOR:SPLITTER
-    splitter_fields = {
-        "Inlet_Branch_Name": "SHWSys1_Demand_Inlet_Branch",
-        **{f"Outlet_Branch_{i+1}_Name": name for i, name in enumerate(demand_branches)},
-        f"Outlet_Branch_{len(demand_branches) + 1}_Name": "SHWSys1_Demand_Bypass_Branch"
-    }
-
-    # Add Connector:Splitter for demand branches
-    idf.newidfobject("CONNECTOR:SPLITTER",
-        Name="SHWSys1_Demand_Splitter",
-        **splitter_fields
-    )
-
-
-    # Prepare the list of branches in the required format for CONNECTOR:MIXER
-    mixer_fields = {
-        "Outlet_Branch_Name": "SHWSys1_Demand_Outlet_Branch",
-        **{f"Inlet_Branch_{i+1}_Name": name for i, name in enumerate(demand_branches)},
-        f"Inlet_Branch_{len(demand_branches) + 1}_Name": "SHWSys1_Demand_Bypass_Branch"
-    }
-
-    # Add Connector:Mixer for demand branches
-    idf.newidfobject("CONNECTOR:MIXER",
-        Name="SHWSys1_Demand_Mixer",
-        **mixer_fields
-    )
-
 def add_v2_fan_natural_ventilation(idf):
-    # ScheduleTypeLimits for Temperature
-    idf.newidfobject(
-        "SCHEDULETYPELIMITS",
-        Name="Temperature",
-        Lower_Limit_Value=-60,  # Adjust these values based on your requirements
-        Upper_Limit_Value=200,
-        Numeric_Type="Continuous",
-        Unit_Type="Temperature"
-    )
-
-
-    idf.newidfobject(
-        "SCHEDULE:COMPACT",
-        Name="Sliding_Doors_Ventilation_Availability_SCH",
-        Schedule_Type_Limits_Name="Fraction",
-        Field_1="Through: 12/31",
-        Field_2="For: WinterDesignDay",
-        Field_3="Until: 24:00,0",
-        Field_4="For: SummerDesignDay",
-        Field_5="Until: 24:00,0",
-        Field_6="For: AllOtherDays",
-        Field_7="Until: 6:00,0",
-        Field_8="Until: 22:00,1",
-        Field_9="Until: 24:00,0"
-    )
-
-    idf.newidfobject("SCHEDULE:COMPACT",
-                     Name="Zone Control Type Schedule",
-                     Schedule_Type_Limits_Name="Any Number",
-                     Field_1="Through: 12/31",
-                     Field_2="For: AllDays",
-                     Field_3="Until: 24:00,4")
-    
-    # Supply Air Setpoint Schedule
-    idf.newidfobject("SCHEDULE:COMPACT",
-                     Name="Supply Air Setpoint Schedule",
-                     Schedule_Type_Limits_Name="Temperature",
-                     Field_1="Through: 12/31",
-                     Field_2="For: AllDays",
-                     Field_3="Until: 24:00,14.0")  # Ensure this is realistic and matches your cooling setpoint
-
-    # Always On Schedule
-    idf.newidfobject("SCHEDULE:COMPACT",
-                     Name="Always On",
-                     Schedule_Type_Limits_Name="Any Number",
-                     Field_1="Through: 12/31",
-                     Field_2="For: AllDays",
-                     Field_3="Until: 24:00,1")
-
-    # Night Ventilation Schedule
-    idf.newidfobject("SCHEDULE:COMPACT",
-                     Name="NightVentSched",
-                     Schedule_Type_Limits_Name="Fraction",
-                     Field_1="Through: 12/31",
-                     Field_2="For: AllDays",
-                     Field_3="Until: 6:00,1",
-                     Field_4="Until: 22:00,0",
-                     Field_5="Until: 24:00,1")
+    add_fragment(idf, "natural_ventilation_schedules", natural_ventilation_schedules_fragment)
 
     current_floor = 0
 
@@ -1907,6 +1882,67 @@ def add_v2_fan_natural_ventilation(idf):
                 Maximum_Wind_Speed=max_wind_speed
             )
 
+
+def natural_ventilation_schedules_fragment(idf):
+    # ScheduleTypeLimits for Temperature
+    idf.newidfobject(
+        "SCHEDULETYPELIMITS",
+        Name="Temperature",
+        Lower_Limit_Value=-60,  # Adjust these values based on your requirements
+        Upper_Limit_Value=200,
+        Numeric_Type="Continuous",
+        Unit_Type="Temperature"
+    )
+
+
+    idf.newidfobject(
+        "SCHEDULE:COMPACT",
+        Name="Sliding_Doors_Ventilation_Availability_SCH",
+        Schedule_Type_Limits_Name="Fraction",
+        Field_1="Through: 12/31",
+        Field_2="For: WinterDesignDay",
+        Field_3="Until: 24:00,0",
+        Field_4="For: SummerDesignDay",
+        Field_5="Until: 24:00,0",
+        Field_6="For: AllOtherDays",
+        Field_7="Until: 6:00,0",
+        Field_8="Until: 22:00,1",
+        Field_9="Until: 24:00,0"
+    )
+
+    idf.newidfobject("SCHEDULE:COMPACT",
+                     Name="Zone Control Type Schedule",
+                     Schedule_Type_Limits_Name="Any Number",
+                     Field_1="Through: 12/31",
+                     Field_2="For: AllDays",
+                     Field_3="Until: 24:00,4")
+    
+    # Supply Air Setpoint Schedule
+    idf.newidfobject("SCHEDULE:COMPACT",
+                     Name="Supply Air Setpoint Schedule",
+                     Schedule_Type_Limits_Name="Temperature",
+                     Field_1="Through: 12/31",
+                     Field_2="For: AllDays",
+                     Field_3="Until: 24:00,14.0")  # Ensure this is realistic and matches your cooling setpoint
+
+    # Always On Schedule
+    idf.newidfobject("SCHEDULE:COMPACT",
+                     Name="Always On",
+                     Schedule_Type_Limits_Name="Any Number",
+                     Field_1="Through: 12/31",
+                     Field_2="For: AllDays",
+                     Field_3="Until: 24:00,1")
+
+    # Night Ventilation Schedule
+    idf.newidfobject("SCHEDULE:COMPACT",
+                     Name="NightVentSched",
+                     Schedule_Type_Limits_Name="Fraction",
+                     Field_1="Through: 12/31",
+                     Field_2="For: AllDays",
+                     Field_3="Until: 6:00,1",
+                     Field_4="Until: 22:00,0",
+                     Field_5="Until: 24:00,1")
+
 def add_H21_RadiantConvective_heating(idf):
 
     # ===================================
@@ -2097,7 +2133,6 @@ def add_H21_RadiantConvective_heating(idf):
 
 
     # Define RadiantConvective components for each zone
-    surfaces = idf.idfobjects['BUILDINGSURFACE:DETAILED']
     demand_branches = []
     # Define RadiantConvective components for each zone
     for i, zone in enumerate(idf.idfobjects['ZONE']):
@@ -2108,7 +2143,7 @@ def add_H21_RadiantConvective_heating(idf):
         outlet_node = f"{zone.Name} Zone Coil Water Out Node"
 
         # Assigning two surfaces to each radiant component
-        zone_surfaces = [s for s in surfaces if s.Zone_Name == zone.Name][:2]
+        zone_surfaces = idf.zone_objects('BUILDINGSURFACE:DETAILED', zone.Name)[:2]
 
         idf.newidfobject("ZONEHVAC:BASEBOARD:RADIANTCONVECTIVE:WATER",
             Name=radiant_name,
@@ -2147,13 +2182,7 @@ def add_H21_RadiantConvective_heating(idf):
         #    )
 
         # Check if ZoneHVAC:EquipmentConnections already exists for the zone
-        existing_equip_connection = None
-        for equip_connection in idf.idfobjects['ZONEHVAC:EQUIPMENTCONNECTIONS']:
-            if equip_connection.Zone_Name == zone.Name:
-                existing_equip_connection = equip_connection
-                break
-
-        if not existing_equip_connection:
+        if not idf.zone_objects('ZONEHVAC:EQUIPMENTCONNECTIONS', zone.Name):
             # Create a new ZoneHVAC:EquipmentConnections
             idf.newidfobject("ZONEHVAC:EQUIPMENTCONNECTIONS",
                 Zone_Name=zone.Name,
@@ -2164,7 +2193,7 @@ def add_H21_RadiantConvective_heating(idf):
             )
 
         # Create NodeList if not exists
-        if not any(nodelist.Name == f"{zone.Name} In Nodes" for nodelist in idf.idfobjects['NODELIST']):
+        if not idf.getobject('NODELIST', f"{zone.Name} In Nodes"):
             idf.newidfobject("NODELIST",
                 Name=f"{zone.Name} In Nodes",
                 Node_1_Name=f"{zone.Name} In Node"
@@ -2262,6 +2291,83 @@ def add_H21_RadiantConvective_heating(idf):
 
 
 def add_H2_RadiantConvective_heating(idf):
+    add_fragment(idf, "radiant_heating_plant", radiant_heating_plant_fragment)
+
+    # Radiant Convective Heating Setup
+    demand_branches = []
+
+    for i, zone in enumerate(idf.idfobjects['ZONE']):
+        radiant_name = f"{zone.Name} Baseboard"
+        design_name = "Baseboard Design"
+        inlet_node = f"{zone.Name} Zone Coil Water In Node"
+        outlet_node = f"{zone.Name} Zone Coil Water Out Node"
+
+        zone_surfaces = idf.zone_objects('BUILDINGSURFACE:DETAILED', zone.Name)[:2]
+
+        idf.newidfobject("ZONEHVAC:BASEBOARD:RADIANTCONVECTIVE:WATER",
+            Name=radiant_name,
+            Design_Object=design_name,
+            Availability_Schedule_Name="Fan Schedule",
+            Inlet_Node_Name=inlet_node,
+            Outlet_Node_Name=outlet_node,
+            Surface_1_Name=zone_surfaces[0].Name if len(zone_surfaces) > 0 else "",
+            Surface_2_Name=zone_surfaces[1].Name if len(zone_surfaces) > 1 else "",
+            Rated_Average_Water_Temperature=87.78,
+            Rated_Water_Mass_Flow_Rate=0.063,
+            Heating_Design_Capacity="autosize",
+            Maximum_Water_Flow_Rate="autosize",
+            Fraction_of_Radiant_Energy_to_Surface_1=0.4
+        )
+
+        branch_name = f"{zone.Name} Baseboard Branch"
+
+        idf.newidfobject("BRANCH",
+            Name=branch_name,
+            Component_1_Object_Type="ZoneHVAC:Baseboard:RadiantConvective:Water",
+            Component_1_Name=radiant_name,
+            Component_1_Inlet_Node_Name=inlet_node,
+            Component_1_Outlet_Node_Name=outlet_node
+        )
+
+        demand_branches.append(branch_name)
+
+    # Define Demand Side Branches and Connectors
+    branch_list_fields = {
+        "Branch_1_Name": "Heating Demand Inlet Branch",
+        **{f"Branch_{i+2}_Name": name for i, name in enumerate(demand_branches)},
+        f"Branch_{len(demand_branches) + 2}_Name": "Heating Demand Bypass Branch",
+        f"Branch_{len(demand_branches) + 3}_Name": "Heating Demand Outlet Branch"
+    }
+
+    idf.newidfobject("BRANCHLIST",
+        Name="Heating Demand Side Branches",
+        **branch_list_fields
+    )
+
+    splitter_fields = {
+        "Inlet_Branch_Name": "Heating Demand Inlet Branch",
+        **{f"Outlet_Branch_{i+1}_Name": name for i, name in enumerate(demand_branches)},
+        f"Outlet_Branch_{len(demand_branches) + 1}_Name": "Heating Demand Bypass Branch"
+    }
+
+    idf.newidfobject("CONNECTOR:SPLITTER",
+        Name="Heating Demand Splitter",
+        **splitter_fields
+    )
+
+    mixer_fields = {
+        "Outlet_Branch_Name": "Heating Demand Outlet Branch",
+        **{f"Inlet_Branch_{i+1}_Name": name for i, name in enumerate(demand_branches)},
+        f"Inlet_Branch_{len(demand_branches) + 1}_Name": "Heating Demand Bypass Branch"
+    }
+
+    idf.newidfobject("CONNECTOR:MIXER",
+        Name="Heating Demand Mixer",
+        **mixer_fields
+    )
+
+
+def radiant_heating_plant_fragment(idf):
     # Setpoint Manager for Hot Water Loop
     idf.newidfobject("SETPOINTMANAGER:SCHEDULED",
         Name="Hot Water Loop Setpoint Manager",
@@ -2459,83 +2565,6 @@ def add_H2_RadiantConvective_heating(idf):
         Fraction_of_Radiant_Energy_Incident_on_People=0.03       # Fraction of Radiant Energy Incident on People
     )
 
-
-
-
-    # Radiant Convective Heating Setup
-    surfaces = idf.idfobjects['BUILDINGSURFACE:DETAILED']
-    demand_branches = []
-
-    for i, zone in enumerate(idf.idfobjects['ZONE']):
-        radiant_name = f"{zone.Name} Baseboard"
-        design_name = "Baseboard Design"
-        inlet_node = f"{zone.Name} Zone Coil Water In Node"
-        outlet_node = f"{zone.Name} Zone Coil Water Out Node"
-
-        zone_surfaces = [s for s in surfaces if s.Zone_Name == zone.Name][:2]
-
-        idf.newidfobject("ZONEHVAC:BASEBOARD:RADIANTCONVECTIVE:WATER",
-            Name=radiant_name,
-            Design_Object=design_name,
-            Availability_Schedule_Name="Fan Schedule",
-            Inlet_Node_Name=inlet_node,
-            Outlet_Node_Name=outlet_node,
-            Surface_1_Name=zone_surfaces[0].Name if len(zone_surfaces) > 0 else "",
-            Surface_2_Name=zone_surfaces[1].Name if len(zone_surfaces) > 1 else "",
-            Rated_Average_Water_Temperature=87.78,
-            Rated_Water_Mass_Flow_Rate=0.063,
-            Heating_Design_Capacity="autosize",
-            Maximum_Water_Flow_Rate="autosize",
-            Fraction_of_Radiant_Energy_to_Surface_1=0.4
-        )
-
-        branch_name = f"{zone.Name} Baseboard Branch"
-
-        idf.newidfobject("BRANCH",
-            Name=branch_name,
-            Component_1_Object_Type="ZoneHVAC:Baseboard:RadiantConvective:Water",
-            Component_1_Name=radiant_name,
-            Component_1_Inlet_Node_Name=inlet_node,
-            Component_1_Outlet_Node_Name=outlet_node
-        )
-
-        demand_branches.append(branch_name)
-
-    # Define Demand Side Branches and Connectors
-    branch_list_fields = {
-        "Branch_1_Name": "Heating Demand Inlet Branch",
-        **{f"Branch_{i+2}_Name": name for i, name in enumerate(demand_branches)},
-        f"Branch_{len(demand_branches) + 2}_Name": "Heating Demand Bypass Branch",
-        f"Branch_{len(demand_branches) + 3}_Name": "Heating Demand Outlet Branch"
-    }
-
-    idf.newidfobject("BRANCHLIST",
-        Name="Heating Demand Side Branches",
-        **branch_list_fields
-    )
-
-    splitter_fields = {
-        "Inlet_Branch_Name": "Heating Demand Inlet Branch",
-        **{f"Outlet_Branch_{i+1}_Name": name for i, name in enumerate(demand_branches)},
-        f"Outlet_Branch_{len(demand_branches) + 1}_Name": "Heating Demand Bypass Branch"
-    }
-
-    idf.newidfobject("CONNECTOR:SPLITTER",
-        Name="Heating Demand Splitter",
-        **splitter_fields
-    )
-
-    mixer_fields = {
-        "Outlet_Branch_Name": "Heating Demand Outlet Branch",
-        **{f"Inlet_Branch_{i+1}_Name": name for i, name in enumerate(demand_branches)},
-        f"Inlet_Branch_{len(demand_branches) + 1}_Name": "Heating Demand Bypass Branch"
-    }
-
-    idf.newidfobject("CONNECTOR:MIXER",
-        Name="Heating Demand Mixer",
-        **mixer_fields
-    )
-
     idf.newidfobject("CONNECTORLIST",
         Name="Heating Demand Side Connectors",
         Connector_1_Object_Type="CONNECTOR:SPLITTER",
@@ -2619,7 +2648,17 @@ def setup_combined_hvac_equipment_V2_H2_2(idf):
 
 
 
-def check_and_add_idfobject(idf):
+def set_reporting_frequency(idf, reporting_frequency):
+    # Report every output variable and meter already in the IDF (e.g. from the base IDF) at one frequency
+    for object_type in OUTPUT_FREQUENCY_OBJECTS:
+        for obj in idf.idfobjects[object_type]:
+            obj.Reporting_Frequency = reporting_frequency
+
+
+def check_and_add_idfobject(idf, reporting_frequency="timestep"):
+    # reporting_frequency (timestep, hourly, daily or monthly) applies to every meter and variable
+    set_reporting_frequency(idf, reporting_frequency)
+
     # Define a list of objects to add, each with their type and parameters
     objects_to_add = [
         # ("OUTPUT:SURFACES:DRAWING", {}), it has error of geoeppy to do ("OUTPUT:SURFACES:DRAWING", "DXF")
@@ -2648,23 +2687,23 @@ def check_and_add_idfobject(idf):
             "Aggregation_Type_for_Variable_or_Meter_3": "ValueWhenMaximumOrMinimum"
         }),
 
-        ("OUTPUT:METER", {"Key_Name": "Fans:Electricity", "Reporting_Frequency": "timestep"}),
+        ("OUTPUT:METER", {"Key_Name": "Fans:Electricity", "Reporting_Frequency": reporting_frequency}),
         
         # Electrical Generation and Storage
         #("OUTPUT:METER", {"Key_Name": "Photovoltaic:Electricity", "Reporting_Frequency": "timestep"}),
         #("OUTPUT:METER", {"Key_Name": "WindTurbine:Electricity", "Reporting_Frequency": "timestep"}),
-        ("OUTPUT:METER", {"Key_Name": "Gas:Facility", "Reporting_Frequency": "timestep"}),
+        ("OUTPUT:METER", {"Key_Name": "Gas:Facility", "Reporting_Frequency": reporting_frequency}),
         
         # Electricity Meters for Whole Building and Sub-Metering
-        ("OUTPUT:METER", {"Key_Name": "Electricity:Facility", "Reporting_Frequency": "timestep"}),
-        ("OUTPUT:METER", {"Key_Name": "Electricity:Building", "Reporting_Frequency": "timestep"}),
+        ("OUTPUT:METER", {"Key_Name": "Electricity:Facility", "Reporting_Frequency": reporting_frequency}),
+        ("OUTPUT:METER", {"Key_Name": "Electricity:Building", "Reporting_Frequency": reporting_frequency}),
        # ("OUTPUT:METER", {"Key_Name": "Electricity:HVAC", "Reporting_Frequency": "timestep"}),
        # ("OUTPUT:METER", {"Key_Name": "InteriorLights:Electricity", "Reporting_Frequency": "timestep"}),
       #  ("OUTPUT:METER", {"Key_Name": "ExteriorLights:Electricity", "Reporting_Frequency": "timestep"}),
       #  ("OUTPUT:METER", {"Key_Name": "Pumps:Electricity", "Reporting_Frequency": "timestep"}),
         
         # Specific Output Variables and Meters
-        ("OUTPUT:METER", {"Key_Name": "Electricity:*", "Reporting_Frequency": "timestep"}),
+        ("OUTPUT:METER", {"Key_Name": "Electricity:*", "Reporting_Frequency": reporting_frequency}),
         
 
 
@@ -2687,7 +2726,7 @@ def check_and_add_idfobject(idf):
         # Special handling for OUTPUT:METER to consider Key_Name
         if object_type == "OUTPUT:METER":
             key_name = parameters.get("Key_Name")
-            existing_objects = [obj for obj in idf.idfobjects[object_type.upper()] if obj.Key_Name == key_name]
+            existing_objects = idf.getobjects(object_type, key_name)
             for obj in existing_objects:
                 idf.removeidfobject(obj)
         else:
@@ -0,0 +1,118 @@
+# idf_registry.py
+from collections import defaultdict
+
+# Fields that tie an object to a zone, in the order they are looked for
+ZONE_FIELDS = ["Zone_Name", "Zone_or_ZoneList_Name", "Zone_or_ZoneList_or_Space_or_SpaceList_Name"]
+
+# (zone field, has Surface_Type) per object type; IDD field lists run to thousands of names
+_indexed_fields = {}
+
+
+def _fields(obj):
+    key = obj.key.upper()
+    fields = _indexed_fields.get(key)
+    if fields is None:
+        zone_field = next((field for field in ZONE_FIELDS if field in obj.objls), None)
+        fields = _indexed_fields[key] = (zone_field, "Surface_Type" in obj.objls)
+    return fields
+
+
+def _remove(objects, obj):
+    # EpBunch compares field values, so remove by identity
+    for i, other in enumerate(objects):
+        if other is obj:
+            del objects[i]
+            return
+
+
+class IDFRegistry:
+    """
+    A geomeppy IDF with hash indexes by (type, name), by zone and by surface type.
+
+    Everything not defined here is passed through to the wrapped IDF. The indexes follow objects
+    added or removed through newidfobject, copyidfobject and removeidfobject, and are rebuilt after
+    the geomeppy geometry operations; call reindex() after renaming an object or changing its zone
+    or surface type some other way.
+    """
+
+    def __init__(self, idf):
+        self.idf = idf
+        self.reindex()
+
+    def __getattr__(self, name):
+        if name == "idf":
+            raise AttributeError(name)
+        return getattr(self.idf, name)
+
+    def reindex(self):
+        """Rebuild every index from the objects currently in the IDF."""
+        self._by_name = defaultdict(list)
+        self._by_zone = defaultdict(list)
+        self._by_surface_type = defaultdict(list)
+        for objects in self.idf.idfobjects.values():
+            for obj in objects:
+                self._index(obj)
+
+    def _index_keys(self, obj):
+        key = obj.key.upper()
+        keys = []
+        # The first field is the name, or the key of unnamed objects such as Output:Meter
+        if len(obj.obj) > 1:
+            keys.append((self._by_name, (key, str(obj.obj[1]).upper())))
+        zone_field, has_surface_type = _fields(obj)
+        if zone_field:
+            keys.append((self._by_zone, (key, str(obj[zone_field]).upper())))
+        if has_surface_type:
+            keys.append((self._by_surface_type, (key, str(obj.Surface_Type).upper())))
+        return keys
+
+    def _index(self, obj):
+        for index, index_key in self._index_keys(obj):
+            index[index_key].append(obj)
+
+    def _unindex(self, obj):
+        for index, index_key in self._index_keys(obj):
+            _remove(index[index_key], obj)
+
+    def newidfobject(self, key, **kwargs):
+        obj = self.idf.newidfobject(key, **kwargs)
+        self._index(obj)
+        return obj
+
+    def copyidfobject(self, idfobject):
+        obj = self.idf.copyidfobject(idfobject)
+        self._index(obj)
+        return obj
+
+    def removeidfobject(self, idfobject):
+        self._unindex(idfobject)
+        self.idf.removeidfobject(idfobject)
+
+    # Geomeppy adds, removes and splits surfaces internally, so these reindex afterwards
+    def add_block(self, *args, **kwargs):
+        self.idf.add_block(*args, **kwargs)
+        self.reindex()
+
+    def intersect_match(self):
+        self.idf.intersect_match()
+        self.reindex()
+
+    def set_wwr(self, *args, **kwargs):
+        self.idf.set_wwr(*args, **kwargs)
+        self.reindex()
+
+    def getobjects(self, key, name):
+        """All objects of a type with the given name (or key), case-insensitive."""
+        return list(self._by_name.get((key.upper(), str(name).upper()), []))
+
+    def getobject(self, key, name):
+        objects = self._by_name.get((key.upper(), str(name).upper()))
+        return objects[0] if objects else None
+
+    def zone_objects(self, key, zone_name):
+        """Objects of a type that belong to a zone, in the order they were added."""
+        return list(self._by_zone.get((key.upper(), str(zone_name).upper()), []))
+
+    def surfaces_of_type(self, surface_type, key="BUILDINGSURFACE:DETAILED"):
+        """Surfaces of a type (wall, roof, floor, ceiling), in the order they were added."""
+        return list(self._by_surface_type.get((key.upper(), surface_type.upper()), []))
@@ -0,0 +1,39 @@
+# idf_template.py
+from io import StringIO
+
+from geomeppy import IDF
+
+# Parsed base IDF templates, one per (base_idf_path, idd_path) in this process
+_templates = {}
+
+
+def get_template(base_idf_path, idd_path):
+    """Return the parsed base IDF for this process, parsing the IDD and IDF only on first use."""
+    key = (base_idf_path, idd_path)
+    template = _templates.get(key)
+    if template is None:
+        # Eppy keeps the IDD on the IDF class, so this is a no-op after the first call
+        IDF.setiddname(idd_path)
+        template = IDF(base_idf_path)
+        _templates[key] = template
+    return template
+
+
+def clone_idf(template):
+    """Create an independent copy of a parsed IDF without re-reading any file."""
+    idf = IDF(StringIO(""))
+    for objects in template.idfobjects.values():
+        for obj in objects:
+            # copyidfobject copies the field list, so the template is never mutated
+            idf.copyidfobject(obj)
+    return idf
+
+
+def load_base_idf(base_idf_path, idd_path):
+    """Return a fresh, modifiable copy of the base IDF for one building."""
+    return clone_idf(get_template(base_idf_path, idd_path))
+
+
+def clear_templates():
+    """Drop all cached templates, e.g. after the base IDF on disk has changed."""
+    _templates.clear()
@@ -0,0 +1,127 @@
+# job_queue.py
+import json
+import os
+import sqlite3
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from datetime import datetime
+
+from config import get_job_config
+
+PROGRESS_FIELDS = ("total", "generated", "simulated", "postprocessed", "failed")
+
+CREATE_JOBS_TABLE = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    user_config TEXT NOT NULL,
+    submitted_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    total INTEGER NOT NULL DEFAULT 0,
+    generated INTEGER NOT NULL DEFAULT 0,
+    simulated INTEGER NOT NULL DEFAULT 0,
+    postprocessed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    result_path TEXT,
+    error TEXT
+)
+"""
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class JobQueue:
+    """
+    SQLite-backed queue that runs analyses in background threads.
+
+    runner(user_config, on_progress, run_id) does the actual work in a workspace named after the
+    job and returns (result_path, results); on_progress is called with on_progress('loaded', n) once the building count is known and with
+    on_progress('generated' | 'simulated' | 'postprocessed' | 'failed') as buildings advance.
+    """
+
+    def __init__(self, runner, db_path=None, num_workers=None):
+        job_config = get_job_config()
+        self.runner = runner
+        self.db_path = db_path or job_config['db_path']
+        self.executor = ThreadPoolExecutor(max_workers=num_workers or job_config['num_workers'])
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(CREATE_JOBS_TABLE)
+            # Jobs that were queued or running when the server stopped will never finish
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Interrupted by server restart', finished_at = ? "
+                "WHERE status IN ('queued', 'running')",
+                (_now(),)
+            )
+
+    @contextmanager
+    def _connect(self):
+        # sqlite3's own context manager only commits; closing() also releases the connection
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn:
+            yield conn
+            conn.commit()
+
+    def _update(self, job_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.lock, self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def submit(self, user_config):
+        """Stores a new job and schedules it; returns the job ID immediately."""
+        job_id = uuid.uuid4().hex
+        with self.lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, status, user_config, submitted_at) VALUES (?, 'queued', ?, ?)",
+                (job_id, json.dumps(user_config), _now())
+            )
+        self.executor.submit(self._run, job_id, user_config)
+        return job_id
+
+    def get(self, job_id):
+        """Returns the job's status and progress as a dict, or None for an unknown job."""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['user_config'] = json.loads(job['user_config'])
+        job['progress'] = {field: job.pop(field) for field in PROGRESS_FIELDS}
+        return job
+
+    def active_job_ids(self):
+        """IDs of the jobs that are queued or running, whose workspaces must not expire."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT job_id FROM jobs WHERE status IN ('queued', 'running')").fetchall()
+        return [job_id for job_id, in rows]
+
+    def status_counts(self):
+        """Number of jobs per status, e.g. {('queued',): 2, ('running',): 1}, for the jobs gauge."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {(status,): count for status, count in rows}
+
+    def _run(self, job_id, user_config):
+        self._update(job_id, status='running', started_at=_now())
+
+        def on_progress(event, count=1):
+            if event == 'loaded':
+                self._update(job_id, total=count)
+            elif event in PROGRESS_FIELDS:
+                with self.lock, self._connect() as conn:
+                    conn.execute(f"UPDATE jobs SET {event} = {event} + ? WHERE job_id = ?", (count, job_id))
+
+        try:
+            result_path, _ = self.runner(user_config, on_progress=on_progress, run_id=job_id)
+            self._update(job_id, status='completed', result_path=result_path, finished_at=_now())
+        except Exception as e:
+            traceback.print_exc()
+            self._update(job_id, status='failed', error=str(e), finished_at=_now())
@@ -1,88 +1,166 @@
 import os
-import pandas as pd
-import json
-import re
-from datetime import datetime
-
-import os
+import numpy as np
 import pandas as pd
 import json
 import re
 from datetime import datetime
 from decimal import Decimal
 
-def process_output_files(output_dir, buildings_df):
+from config import get_simulation_config
+from metrics import record_stage
+from result_store import ResultStore, open_result_store
+from sql_reader import read_energy_series
+from timing import SpanTimer
+
+# The only EnergyPlus CSV columns the energy JSON is built from; ReadVarsESO appends the frequency
+TIME_COLUMN = 'Date/Time'
+CSV_FREQUENCY_LABELS = {"timestep": "TimeStep", "hourly": "Hourly", "daily": "Daily", "monthly": "Monthly"}
+
+
+def energy_columns(reporting_frequency="timestep"):
+    """Returns (electricity_column, gas_columns) as named in the CSV for this reporting frequency."""
+    label = CSV_FREQUENCY_LABELS[reporting_frequency]
+    electricity = f'Electricity:Facility [J]({label})'
+    gas = [
+        f'SHWSYS1_WATER_HEATER:Water Heater Heating Energy [J]({label})',
+        f'CENTRAL BOILER:Boiler Heating Energy [J]({label})',
+    ]
+    return electricity, gas
+
+
+def read_energy_columns(file_path, include_time=True, reporting_frequency="timestep"):
+    """
+    Reads only the energy columns (and optionally Date/Time) of an EnergyPlus CSV with the C parser.
+    Energy columns are parsed straight to float64; every other column is skipped while tokenizing.
+    """
+    electricity, gas = energy_columns(reporting_frequency)
+    wanted = {electricity, *gas}
+    dtypes = {column: np.float64 for column in wanted}
+    if include_time:
+        wanted.add(TIME_COLUMN)
+    return pd.read_csv(
+        file_path,
+        usecols=lambda column: column in wanted,
+        dtype=dtypes,
+        engine='c',
+    )
+
+
+def read_csv_energy_series(file_path, include_time=True, reporting_frequency="timestep"):
+    """Returns (time_labels or None, electricity, natural_gas) from a ReadVarsESO CSV, or None without electricity."""
+    electricity_column, gas_columns = energy_columns(reporting_frequency)
+    df = read_energy_columns(file_path, include_time, reporting_frequency)
+    if electricity_column not in df.columns:
+        return None
+
+    # Natural gas is the sum of the water heater and boiler energy, where present
+    electricity = df[electricity_column].to_numpy()
+    natural_gas = np.zeros(len(df))
+    for column in gas_columns:
+        if column in df.columns:
+            natural_gas += df[column].to_numpy()
+    time_labels = df[TIME_COLUMN].tolist() if include_time else None
+    return time_labels, electricity, natural_gas
+
+
+def read_building_output(file_path, building_id, building_info, time_intervals=None, reporting_frequency="timestep"):
+    """
+    Reads one building's EnergyPlus output and returns (time_intervals, building_record),
+    or None when it has no electricity data. file_path is either the SQLite output (.sql)
+    or the ReadVarsESO CSV, reported at reporting_frequency.
+
+    All buildings of a run share the same timesteps, so callers pass the time_intervals of the
+    first building back in and Date/Time is then not read again.
+    """
+    include_time = time_intervals is None
+    if file_path.endswith('.sql'):
+        series = read_energy_series(file_path, include_time, reporting_frequency)
+    else:
+        series = read_csv_energy_series(file_path, include_time, reporting_frequency)
+
+    # Check if the necessary data exists
+    if series is None:
+        print(f"Skipping file {os.path.basename(file_path)}: Missing Electricity data")
+        return None
+    time_labels, electricity, natural_gas = series
+    if include_time:
+        time_intervals = time_labels
+
+    # Convert any Decimal values to float
+    building_info = dict(building_info)
+    for key, value in building_info.items():
+        if isinstance(value, Decimal):
+            building_info[key] = float(value)
+
+    return time_intervals, {
+        'buildingId': building_id,
+        'Natural Gas Consumption (J)': natural_gas.tolist(),
+        'Electricity Consumption (J)': electricity.tolist(),
+        'Total Energy (J)': (electricity + natural_gas).tolist(),
+        'building_info': building_info
+    }
+
+
+def iter_energy_json(store_dir):
+    """Yields the energy JSON document for a closed result store piece by piece, one building at a time."""
+    reader = open_result_store(store_dir)
+    yield '{"timeIntervals": ' + json.dumps(reader.time_intervals) + ', "buildings": ['
+    for i, record in enumerate(reader.iter_records()):
+        yield (", " if i else "") + json.dumps(record)
+    yield "]}"
+
+
+def write_energy_json(output_dir, store_dir):
+    """Writes the result store to energy_data_<date>.json without loading it into memory; returns the path."""
     # Today's date in YYYY-MM-DD format
     today = datetime.now().strftime("%Y-%m-%d")
+
+    output_file = os.path.join(output_dir, f"energy_data_{today}.json")
+    print(f"Writing to file: {output_file}")
+    with open(output_file, 'w') as f:
+        for chunk in iter_energy_json(store_dir):
+            f.write(chunk)
+
+    return output_file
+
+
+def process_output_files(output_dir, buildings_df, reporting_frequency="timestep"):
     print(f"Processing output directory: {output_dir}")
 
-    # Create a dictionary to hold all the data
-    all_data = {'timeIntervals': [], 'buildings': []}
+    store = ResultStore(os.path.join(output_dir, "results"))
+    time_intervals = None
+    # One lookup per building instead of filtering buildings_df for every file
+    building_rows = {row['nummeraanduiding_id']: row for row in buildings_df.to_dict('records')}
+
+    # Simulations write either a SQLite database or a CSV per building, depending on RESULT_SOURCE
+    extension = '.sql' if get_simulation_config()['result_source'] == 'sqlite' else '.csv'
 
     # Define a regex to extract the building ID from filenames
-    building_id_pattern = re.compile(r"modified_building_(\d+)\.csv")
+    building_id_pattern = re.compile(rf"modified_building_(\d+){re.escape(extension)}")
 
     # Iterate through all files in the directory
     for filename in os.listdir(output_dir):
-        if filename.startswith('modified_building') and filename.endswith('.csv'):
+        if filename.startswith('modified_building') and filename.endswith(extension):
             print(f"Processing file: {filename}")
             building_id_match = building_id_pattern.search(filename)
             if not building_id_match:
                 continue
             building_id = building_id_match.group(1)
 
-            # Read the CSV file
-            file_path = os.path.join(output_dir, filename)
-            df = pd.read_csv(file_path)
+            # Get the additional building data from buildings_df
+            building_info = building_rows[building_id]
 
-            # Check if the necessary columns exist
-            if 'Electricity:Facility [J](TimeStep)' not in df.columns:
-                print(f"Skipping file {filename}: Missing Electricity data")
+            timer = SpanTimer()
+            output = timer.call(read_building_output, os.path.join(output_dir, filename), building_id, building_info, time_intervals, reporting_frequency)
+            record_stage('postprocess', {"status": "failed" if output is None else "success", "spans": timer.spans})
+            if output is None:
                 continue
+            time_intervals = output[0]
 
-            # Handle natural gas consumption by summing relevant columns
-            df['NaturalGas:Facility [J](TimeStep)'] = df.get('SHWSYS1_WATER_HEATER:Water Heater Heating Energy [J](TimeStep)', 0) + \
-                                                      df.get('CENTRAL BOILER:Boiler Heating Energy [J](TimeStep)', 0)
-
-            # Calculate total energy consumption
-            df['TotalEnergy [J](TimeStep)'] = df['Electricity:Facility [J](TimeStep)'] + df['NaturalGas:Facility [J](TimeStep)']
-
-            # Rename columns for clarity
-            df.rename(columns={
-                'Date/Time': 'Time',
-                'NaturalGas:Facility [J](TimeStep)': 'Natural Gas Consumption (J)',
-                'Electricity:Facility [J](TimeStep)': 'Electricity Consumption (J)',
-                'TotalEnergy [J](TimeStep)': 'Total Energy (J)'
-            }, inplace=True)
-
-            # If time intervals are empty, fill them
-            if not all_data['timeIntervals']:
-                all_data['timeIntervals'] = df['Time'].tolist()
+            # Append the building to the on-disk store instead of collecting it in memory
+            store.append(*output)
 
-            # Get the additional building data from buildings_df
-            building_info = buildings_df[buildings_df['nummeraanduiding_id'] == building_id].to_dict('records')[0]
-
-            # Convert any Decimal values to float
-            for key, value in building_info.items():
-                if isinstance(value, Decimal):
-                    building_info[key] = float(value)
-
-            # Append the data
-            all_data['buildings'].append({
-                'buildingId': building_id,
-                'Natural Gas Consumption (J)': df['Natural Gas Consumption (J)'].tolist(),
-                'Electricity Consumption (J)': df['Electricity Consumption (J)'].tolist(),
-                'Total Energy (J)': df['Total Energy (J)'].tolist(),
-                'building_info': building_info
-            })
-
-    # Write all the data to a single JSON file
-    output_file = os.path.join(output_dir, f"energy_data_{today}.json")
-    print(f"Writing to file: {output_file}")
-    with open(output_file, 'w') as f:
-        json.dump(all_data, f, indent=4)
-
-    return output_file
+    return write_energy_json(output_dir, store.close())
 
 
 
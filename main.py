@@ -1,159 +1,151 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import os
 import json
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import necessary modules
-from config import get_idf_config, get_conn_params, get_db_config
+from config import get_idf_config, get_conn_params, get_db_config, get_workspace_config
 from config_manager import ConfigurationManager, preprocess_building_data
-from configuration_setup import setup_configurations
-from idf_operations import (
-    update_construction_materials, 
-    add_ground_temperatures, 
-    add_water_heating, 
-    add_v2_fan_natural_ventilation, 
-    remove_building_object, 
-    create_building_block, 
-    update_idf_for_fenestration,
-    assign_constructions_to_surfaces, 
-    add_internal_mass_to_all_zones_with_first_construction, 
-    add_lights_to_all_zones, 
-    generate_detailed_electric_equipment, 
-    add_year_long_run_period, 
-    add_outdoor_air_and_zone_sizing_to_all_zones, 
-    add_door_to_wall, 
-    add_hvac_schedules, 
-    add_H2_RadiantConvective_heating, 
-    setup_combined_hvac_equipment_V2_H2_2, 
-    check_and_add_idfobject,
-    add_people_and_activity_schedules
-)
-from runner_generator import simulate_all
-from json_processor import process_output_files
-from geomeppy import IDF
+from configuration_setup import get_configuration
+from pipeline import run_pipeline, iter_pipeline_json
+from job_queue import JobQueue
+from workspace import create_workspace, finalize_workspace
+from simulation_cache import SimulationCache
+from metrics import REGISTRY, Gauge
+from timing import TIMING_REPORT_FILE, TIMINGS_FILE, TimingRecorder, load_timing_report, print_timing_report
 from database_handler_2 import create_engine_and_load_data
 
 # Flask app setup
 app = Flask(__name__)
 CORS(app)
 
-# Function to process each building and update IDF files
-def process_building(row, base_idf_path, idd_path, output_dir, config_manager):
-    # Set the IDD file for Eppy
-    IDF.setiddname(idd_path)
-
-    # Load the base IDF file
-    idf = IDF(base_idf_path)
-    
-    building_id = row['nummeraanduiding_id']
-    print(f"Processing building ID {building_id}...")
-
-    # Apply modifications using the refactored functions
-    remove_building_object(idf)
-    create_building_block(idf, row)
-    update_construction_materials(idf, row, config_manager)
-    update_idf_for_fenestration(idf, row)
-    assign_constructions_to_surfaces(idf)
-    add_ground_temperatures(idf, config_manager)
-    add_internal_mass_to_all_zones_with_first_construction(idf, row)
-    add_people_and_activity_schedules(idf, row)
-    add_lights_to_all_zones(idf, row)
-    generate_detailed_electric_equipment(idf, row)
-    add_year_long_run_period(idf)
-    add_outdoor_air_and_zone_sizing_to_all_zones(idf)
-    add_door_to_wall(idf)
-    add_hvac_schedules(idf, row)
-    add_water_heating(idf)
-    add_v2_fan_natural_ventilation(idf)
-    add_H2_RadiantConvective_heating(idf)
-    setup_combined_hvac_equipment_V2_H2_2(idf)
-    check_and_add_idfobject(idf)
-
-    # Save the modified IDF file with a unique name
-    modified_idf_filename = f"modified_building_{building_id}.idf"
-    modified_idf_path = os.path.join(output_dir, modified_idf_filename)
-    idf.save(modified_idf_path)
-    
-    print(f"Saved modified IDF for building {building_id} at {modified_idf_path}")
-    return modified_idf_path
-
-# Function to update IDF files and save them
-def update_idf_and_save(buildings_df, output_dir, base_idf_path, idd_path, config_manager):
-    # Ensure the output directory exists
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Process each building in the DataFrame
-    with ThreadPoolExecutor(max_workers=20) as executor:
-        futures = [executor.submit(process_building, row, base_idf_path, idd_path, output_dir, config_manager) for _, row in buildings_df.iterrows()]
-        for future in as_completed(futures):
-            try:
-                future.result()  # This will re-raise any exceptions that occurred in process_building
-            except Exception as e:
-                print(f"Error processing building: {e}")
+# Build (or load) the configuration at startup rather than on the first request
+get_configuration()
+
+# Load everything one analysis run needs
+def prepare_analysis(user_config, on_progress=None, run_id=None):
+    """
+    Loads the configuration and building data for user_config and creates the run's workspace.
+    Returns the keyword arguments for run_pipeline / iter_pipeline_json; their 'timings' recorder
+    already holds the setup stages and writes to the workspace.
+    """
+    timings = TimingRecorder()
+
+    # The base configuration is built once per process and shared read-only between requests
+    with timings.span("load_configuration"):
+        data_structure, config_checksum = get_configuration()
+        config_manager = ConfigurationManager(data_structure, user_config, config_checksum=config_checksum)
+    print(f"Configuration manager created with seed {config_manager.seed} (configuration {config_manager.checksum[:12]}).")
+    # Filter criteria for database query
+    filter_criteria = user_config.get("filter_criteria", {})
+    print("Filter criteria:", filter_criteria)
+
+    # Load building data using the create_engine_and_load_data function
+    # You don't need to pass individual db parameters anymore; the function handles connection internally
+    with timings.span("db_query"):
+        buildings_df = create_engine_and_load_data(filter_criteria=filter_criteria)
+    print(f"Building data loaded with {len(buildings_df)} records.")
+    if on_progress:
+        on_progress('loaded', len(buildings_df))
+
+    # Preprocess the building data
+    with timings.span("preprocess_building_data"):
+        merged_df = preprocess_building_data(buildings_df, config_manager)
+    print(f"Merged data prepared with {len(merged_df)} records.")
+
+    # Get IDF configuration paths; every file of this run goes into its own workspace
+    idf_config = get_idf_config()
+    with timings.span("create_workspace"):
+        run_id, output_dir = create_workspace(run_id, active_runs=job_queue.active_job_ids())
+    print(f"Run {run_id} uses workspace {output_dir}")
+    timings.open(output_dir)
+
+    return dict(
+        merged_df=merged_df,
+        buildings_df=buildings_df,
+        output_dir=output_dir,
+        base_idf_path=idf_config['idf_file_path'],
+        idd_path=idf_config['iddfile'],
+        epwfile=idf_config['epwfile'],
+        config_manager=config_manager,
+        generation_workers=user_config.get("num_workers"),
+        on_progress=on_progress,
+        timings=timings
+    )
+
+# Run the full analysis for one user configuration
+def analyze(user_config, on_progress=None, run_id=None):
+    """
+    Runs the analysis for user_config in its own workspace directory and returns
+    (json_file_path, per-building results).
+    """
+    pipeline_args = prepare_analysis(user_config, on_progress, run_id)
+    output_dir = pipeline_args['output_dir']
+
+    # Generate, simulate and post-process each building as soon as the previous stage is done
+    json_file_path, results = run_pipeline(**pipeline_args)
+    failed = [r for r in results if r['status'] != 'success']
+    print(f"Pipeline finished: {len(results) - len(failed)} buildings succeeded, {len(failed)} failed.")
+    print(f"Processed output files and created JSON: {json_file_path}")
+    print_timing_report(pipeline_args['timings'].close())
+    finalize_workspace(output_dir, keep_files=[json_file_path, os.path.join(output_dir, "results")] + timing_files(output_dir))
+    return json_file_path, results
+
+# Run the analysis and stream its JSON as buildings finish
+def analyze_streaming(user_config):
+    """
+    Prepares the run up front (so setup errors still produce an error response) and returns a
+    generator that yields the energy JSON one building at a time while the pipeline runs.
+    """
+    pipeline_args = prepare_analysis(user_config)
+
+    def generate():
+        try:
+            for chunk in iter_pipeline_json(**pipeline_args):
+                yield chunk
+        finally:
+            print_timing_report(pipeline_args['timings'].close())
+            finalize_workspace(pipeline_args['output_dir'], keep_files=timing_files(pipeline_args['output_dir']))
+
+    return generate()
+
+def timing_files(output_dir):
+    return [os.path.join(output_dir, TIMINGS_FILE), os.path.join(output_dir, TIMING_REPORT_FILE)]
+
+# Background job queue for /jobs; each job runs analyze() with its own user configuration
+job_queue = JobQueue(runner=analyze)
+
+# Job queue depth and simulation cache hit rate are read when /metrics is scraped
+JOBS = Gauge("energy_jobs", "Analysis jobs by status (queued jobs are the queue depth).", ["status"])
+JOBS.set_function(job_queue.status_counts)
+SIMULATION_CACHE_HIT_RATE = Gauge("energy_simulation_cache_hit_rate", "Hit rate of the shared simulation cache since it was created.")
+SIMULATION_CACHE_HIT_RATE.set_function(lambda: SimulationCache().stats()['hit_rate'])
+
+def load_user_config():
+    """Reads the uploaded user_config JSON file from the current request, or returns None."""
+    user_config_file = request.files.get('user_config')
+    if not user_config_file:
+        return None
+    user_config = json.load(user_config_file)
+    print("User config loaded:", user_config)  # Debug print
+    return user_config
 
 # API endpoint to run the analysis
 @app.route('/run_analysis', methods=['GET', 'POST'])
 def run_analysis():
     try:
         # Get the user configuration JSON file from the request
-        user_config_file = request.files.get('user_config')
-        if user_config_file:
-            user_config = json.load(user_config_file)
-            print("User config loaded:", user_config)  # Debug print
-        else:
+        user_config = load_user_config()
+        if user_config is None:
             return jsonify({"error": "User configuration file not provided"}), 400
-        
-
-        # Setup configurations
-        print("Setting up configurations...")
-        data_structure = setup_configurations()
-        print("Configurations set up.")
-        config_manager = ConfigurationManager(data_structure, user_config)
-        print("Configuration manager created.")
-        # Filter criteria for database query
-        filter_criteria = user_config.get("filter_criteria", {})
-        print("Filter criteria:", filter_criteria)
-        # Load building data from the database using the connection parameters from config.py
-
-        # Get database connection parameters
-        print("Getting database connection parameters...")
-        db_config = get_db_config()  # This line is correct and ensures that the connection parameters are loaded.
-        print("Database connection parameters loaded.")
-
-        # Load building data using the create_engine_and_load_data function
-        # You don't need to pass individual db parameters anymore; the function handles connection internally
-        buildings_df = create_engine_and_load_data(filter_criteria=filter_criteria)
-        print(f"Building data loaded with {len(buildings_df)} records.")
 
-        # Preprocess the building data
-        merged_df = preprocess_building_data(buildings_df, config_manager)
-        print(f"Merged data prepared with {len(merged_df)} records.")
-        
-        # Get IDF configuration paths
-        idf_config = get_idf_config()
-        output_dir = idf_config['output_dir']
-        idf_file_path = idf_config['idf_file_path']
-        iddfile = idf_config['iddfile']
-
-        # Update the IDF files and save them
-        update_idf_and_save(
-            buildings_df=merged_df, 
-            output_dir=output_dir, 
-            base_idf_path=idf_file_path, 
-            idd_path=iddfile, 
-            config_manager=config_manager
-        )
-        print("Updated IDF and saved.")
-
-        # Simulate all
-        simulate_all()
-        print("Simulation completed.")
-
-        # Process the output files and include the building data
-        json_file_path = process_output_files(output_dir, buildings_df)
-        print(f"Processed output files and created JSON: {json_file_path}")
+        # "stream" sends each building as soon as it is done instead of one finished file
+        output_mode = request.args.get('output_mode') or user_config.get("output_mode", "file")
+        if output_mode == "stream":
+            return Response(stream_with_context(analyze_streaming(user_config)), mimetype='application/json')
+
+        json_file_path, _ = analyze(user_config)
 
         # Send the JSON file as the response
         return send_file(json_file_path, as_attachment=True)
@@ -162,10 +154,77 @@ def run_analysis():
         print(f"An error occurred: {e}")
         return jsonify({"error": str(e)}), 500
 
+# API endpoint to submit an analysis as a background job
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    try:
+        user_config = load_user_config()
+        if user_config is None:
+            return jsonify({"error": "User configuration file not provided"}), 400
+
+        job_id = job_queue.submit(user_config)
+        return jsonify({
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}",
+            "result_url": f"/jobs/{job_id}/result",
+            "timings_url": f"/jobs/{job_id}/timings"
+        }), 202
+
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return jsonify({"error": str(e)}), 500
+
+# API endpoint for job status and progress
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    return jsonify(job)
+
+# API endpoint to download a finished job's result
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    if job['status'] != 'completed':
+        return jsonify({"error": f"Job {job_id} is {job['status']}", "status": job['status']}), 409
+    # Workspaces, and the results in them, are removed after WORKSPACE_RETENTION_HOURS
+    if not os.path.exists(job['result_path']):
+        return jsonify({"error": f"Result of job {job_id} has expired", "status": "expired"}), 410
+    return send_file(job['result_path'], as_attachment=True)
+
+# API endpoint for a job's per-stage timing report (live while the job runs)
+@app.route('/jobs/<job_id>/timings', methods=['GET'])
+def job_timings(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    report = load_timing_report(os.path.join(get_workspace_config()['root'], job_id))
+    if report is None:
+        return jsonify({"error": f"Job {job_id} has no timings yet", "status": job['status']}), 409
+    return jsonify({"job_id": job_id, "status": job['status'], "stages": report})
+
+# API endpoint for the simulation result cache counters
+@app.route('/simulation_cache', methods=['GET'])
+def simulation_cache_stats():
+    return jsonify(SimulationCache().stats())
+
+# API endpoint for Prometheus scraping (text exposition format)
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
 # Run the Flask application
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
 
-# Sample curl command:
+# Sample curl commands:
 # curl -X POST -F "user_config=@path_to_your_json_file.json" http://127.0.0.1:5000/run_analysis
- 
\ No newline at end of file
+# curl -N -X POST -F "user_config=@path_to_your_json_file.json" "http://127.0.0.1:5000/run_analysis?output_mode=stream"
+# curl -X POST -F "user_config=@path_to_your_json_file.json" http://127.0.0.1:5000/jobs
+# curl http://127.0.0.1:5000/jobs/<job_id>
+# curl -O -J http://127.0.0.1:5000/jobs/<job_id>/result
+# curl http://127.0.0.1:5000/jobs/<job_id>/timings
+# curl http://127.0.0.1:5000/metrics
@@ -0,0 +1,218 @@
+# metrics.py
+# Minimal Prometheus-style metrics (counters, gauges, histograms) rendered in the text exposition
+# format by /metrics, kept in-house so neither the service nor its checks need a Prometheus client.
+#
+# Worker processes do not touch these objects: they return their spans, pid and RSS in their
+# result dicts, and the parent process records them with the record_* helpers below.
+import math
+import os
+import threading
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """All registered metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in list(self.metrics):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple((name, labels[name]) for name in self.labelnames)
+
+    def remove(self, **labels):
+        with self.lock:
+            self.values.pop(self._key(labels), None)
+
+    def samples(self):
+        with self.lock:
+            return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in self.values.items()]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        """
+        Computes the gauge at scrape time instead. function() returns a number (None leaves the
+        sample out), or for a labelled gauge a dict mapping label-value tuples (in labelnames
+        order) to numbers.
+        """
+        self.function = function
+
+    def samples(self):
+        if self.function is None:
+            return super().samples()
+        try:
+            value = self.function()
+        except Exception as e:
+            return [f"# {self.name} unavailable: {_escape(e)}"]
+        if not self.labelnames:
+            return [] if value is None else [f"{self.name} {_format_value(value)}"]
+        return [
+            f"{self.name}{_format_labels(zip(self.labelnames, label_values))} {_format_value(v)}"
+            for label_values, v in value.items()
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self):
+        lines = []
+        with self.lock:
+            for key, state in self.values.items():
+                for bound, count in zip(self.buckets, state["counts"]):
+                    lines.append(f"{self.name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(state['sum'])}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {state['count']}")
+        return lines
+
+
+def current_rss_bytes():
+    """Resident set size of this process in bytes, or None where /proc is not available."""
+    # getrusage only has the peak RSS (and in KiB on Linux but bytes on macOS), so it is not used
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def count_energyplus_processes():
+    """Number of running EnergyPlus processes on this host (0 where /proc is not available)."""
+    count = 0
+    try:
+        pids = [name for name in os.listdir("/proc") if name.isdigit()]
+    except OSError:
+        return 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/comm") as f:
+                if f.read().strip().lower() == "energyplus":
+                    count += 1
+        except OSError:
+            continue
+    return count
+
+
+BUILDINGS_PROCESSED = Counter("energy_buildings_processed_total", "Buildings that completed a pipeline stage.", ["stage"])
+BUILDING_FAILURES = Counter("energy_building_failures_total", "Buildings that failed, by the stage they failed in.", ["stage"])
+STAGE_DURATION = Histogram("energy_stage_duration_seconds", "Duration of per-building pipeline steps.", ["stage"])
+SIMULATION_CACHE_LOOKUPS = Counter("energy_simulation_cache_lookups_total", "Simulation cache lookups by result.", ["result"])
+SIMULATIONS_IN_FLIGHT = Gauge("energy_simulations_in_flight", "Simulations submitted to a simulation pool and not yet finished.")
+ENERGYPLUS_PROCESSES = Gauge("energy_energyplus_processes", "EnergyPlus processes currently running on this host.")
+ENERGYPLUS_PROCESSES.set_function(count_energyplus_processes)
+WORKER_RSS = Gauge("energy_worker_resident_memory_bytes", "Resident memory of worker processes at their last reported result.", ["role", "pid"])
+SERVER_RSS = Gauge("energy_server_resident_memory_bytes", "Resident memory of the API server process.")
+SERVER_RSS.set_function(current_rss_bytes)
+
+
+def record_spans(spans):
+    for span in spans or ():
+        STAGE_DURATION.observe(span['seconds'], stage=span['stage'])
+
+
+def record_worker(role, result):
+    if result.get('pid') is not None and result.get('rss_bytes') is not None:
+        WORKER_RSS.set(result['rss_bytes'], role=role, pid=result['pid'])
+
+
+def record_stage(stage, result):
+    """Records one building's result dict from a pipeline stage (generate, simulate, postprocess)."""
+    record_spans(result.get('spans'))
+    if result.get('status') == 'success':
+        BUILDINGS_PROCESSED.inc(stage=stage)
+    else:
+        BUILDING_FAILURES.inc(stage=stage)
+    # Only runs that actually consulted the cache have a cache_lookup span
+    if any(span['stage'] == 'cache_lookup' for span in result.get('spans') or ()):
+        SIMULATION_CACHE_LOOKUPS.inc(result="hit" if result.get('cache_hit') else "miss")
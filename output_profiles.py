@@ -0,0 +1,56 @@
+# output_profiles.py
+
+# Every object type that asks EnergyPlus for extra output files or report content
+OUTPUT_REQUEST_TYPES = [
+    "OUTPUT:VARIABLE",
+    "OUTPUT:METER",
+    "OUTPUT:METER:METERFILEONLY",
+    "OUTPUT:METER:CUMULATIVE",
+    "OUTPUT:METER:CUMULATIVE:METERFILEONLY",
+    "OUTPUT:VARIABLEDICTIONARY",
+    "OUTPUT:TABLE:SUMMARYREPORTS",
+    "OUTPUT:TABLE:MONTHLY",
+    "OUTPUT:TABLE:ANNUAL",
+    "OUTPUT:TABLE:TIMEBINS",
+    "OUTPUT:SURFACES:LIST",
+    "OUTPUT:SURFACES:DRAWING",
+    "OUTPUT:CONSTRUCTIONS",
+    "OUTPUT:SCHEDULES",
+]
+
+# What each profile keeps. None keeps the IDF's output requests as generated.
+# energy-summary is exactly what json_processor reads: the facility electricity meter and the
+# water heater and boiler energy that make up natural gas.
+OUTPUT_PROFILES = {
+    "full-diagnostics": None,
+    "energy-summary": {
+        "meters": ["Electricity:Facility"],
+        "variables": [("*", "Water Heater Heating Energy"), ("*", "Boiler Heating Energy")],
+    },
+}
+
+DEFAULT_OUTPUT_PROFILE = "full-diagnostics"
+
+
+def apply_output_profile(idf, profile, reporting_frequency="timestep"):
+    """
+    Rewrites the output requests of idf to exactly those of the named profile.
+    Returns the number of output objects removed (0 for full-diagnostics, which changes nothing).
+    """
+    if profile not in OUTPUT_PROFILES:
+        raise ValueError(f"Unknown output profile {profile!r}; expected one of {', '.join(OUTPUT_PROFILES)}")
+    spec = OUTPUT_PROFILES[profile]
+    if spec is None:
+        return 0
+
+    removed = 0
+    for object_type in OUTPUT_REQUEST_TYPES:
+        for obj in list(idf.idfobjects[object_type]):
+            idf.removeidfobject(obj)
+            removed += 1
+
+    for meter in spec["meters"]:
+        idf.newidfobject("OUTPUT:METER", Key_Name=meter, Reporting_Frequency=reporting_frequency)
+    for key_value, variable in spec["variables"]:
+        idf.newidfobject("OUTPUT:VARIABLE", Key_Value=key_value, Variable_Name=variable, Reporting_Frequency=reporting_frequency)
+    return removed
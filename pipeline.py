@@ -0,0 +1,231 @@
+# pipeline.py
+import json
+import os
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import metrics
+from config import get_generation_config, get_simulation_config
+from generation_engine import chunk_rows, failed_chunk_results, make_generation_pool, process_rows
+from json_processor import read_building_output, write_energy_json
+from result_store import ResultStore
+from runner_generator import run_simulation
+from timing import SpanTimer, TimingRecorder
+
+
+# Process pool role of each stage, for the per-worker memory gauge
+WORKER_ROLES = {"generate": "generation", "simulate": "simulation"}
+
+
+def _postprocess(simulation_result, building_id, building_info, run_time_intervals, reporting_frequency):
+    """
+    Post-processing stage: read one building's simulation output; returns (time_intervals, record, spans).
+    run_time_intervals is filled from the first building, so Date/Time is parsed once per run.
+    """
+    timer = SpanTimer()
+    output = timer.call(read_building_output, simulation_result['output_path'], building_id, building_info, run_time_intervals or None, reporting_frequency)
+    if output is None:
+        raise ValueError("Simulation output has no electricity data")
+    if not run_time_intervals:
+        run_time_intervals.extend(output[0])
+    return output + (timer.spans,)
+
+
+def iter_pipeline(merged_df, buildings_df, output_dir, base_idf_path, idd_path, epwfile, config_manager,
+                  generation_workers=None, simulation_workers=None, max_pending=None, chunk_size=None, on_progress=None, timings=None):
+    """
+    Runs generation, simulation and post-processing as one bounded producer/consumer pipeline.
+
+    A building is simulated as soon as its IDF is written and post-processed as soon as its
+    simulation finishes. Generation pauses while more than max_pending IDFs are waiting for a
+    simulation slot, so the stages run concurrently without generation racing ahead.
+
+    Yields one dict per building with its final 'stage' and 'status'; successful buildings also
+    carry 'time_intervals' and 'record' (the building's JSON record). If given, on_progress is
+    called with 'generated', 'simulated', 'postprocessed' or 'failed' as each stage completes.
+    If given, timings (a TimingRecorder) receives every building's generation, simulation and
+    post-processing spans as they come back.
+    """
+    def report(event):
+        if on_progress:
+            on_progress(event)
+
+    worker_labels = set()
+
+    def record_result(stage, building_id, result):
+        # Spans go to the run's timing recorder; counters, histograms and worker RSS to /metrics
+        if timings and result.get('spans'):
+            timings.add(building_id, result['spans'])
+        metrics.record_stage(stage, result)
+        if stage in WORKER_ROLES and result.get('pid') is not None:
+            metrics.record_worker(WORKER_ROLES[stage], result)
+            worker_labels.add((WORKER_ROLES[stage], result['pid']))
+
+    generation_config = get_generation_config()
+    simulation_config = get_simulation_config()
+    generation_workers = generation_workers or generation_config['num_workers']
+    simulation_workers = simulation_workers or simulation_config['num_workers']
+    max_pending = max_pending if max_pending is not None else simulation_config['max_pending']
+    chunk_size = chunk_size or generation_config['chunk_size']
+
+    os.makedirs(output_dir, exist_ok=True)
+    building_info = {row['nummeraanduiding_id']: row for row in buildings_df.to_dict('records')}
+
+    # Small chunks keep the simulators fed early instead of waiting for a large first chunk
+    chunk_size = max(1, min(chunk_size, len(merged_df) // (generation_workers * 4) or 1))
+    pending_chunks = deque(chunk_rows(merged_df, chunk_size))
+    if not pending_chunks:
+        return
+
+    output_options = {"reporting_frequency": config_manager.reporting_frequency, "output_profile": config_manager.output_profile}
+    simulation_totals = {"runs": 0, "seconds": 0.0, "output_bytes": 0}
+    futures = {}
+    run_time_intervals = []  # only touched by the single post-processing thread
+    generating = 0
+    simulating = 0
+
+    with make_generation_pool(min(generation_workers, len(pending_chunks)), base_idf_path, idd_path, output_dir, config_manager) as generation_pool, \
+            ProcessPoolExecutor(max_workers=simulation_workers) as simulation_pool, \
+            ThreadPoolExecutor(max_workers=1) as postprocess_pool:
+
+        def refill():
+            nonlocal generating
+            while pending_chunks and generating < generation_workers and simulating < simulation_workers + max_pending:
+                chunk = pending_chunks.popleft()
+                futures[generation_pool.submit(process_rows, chunk)] = ('generate', chunk)
+                generating += 1
+
+        try:
+            refill()
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, payload = futures.pop(future)
+
+                    if stage == 'generate':
+                        generating -= 1
+                        try:
+                            results = future.result()
+                        except Exception as e:
+                            results = failed_chunk_results(payload, e)
+                        for result in results:
+                            record_result('generate', result['building_id'], result)
+                            if result['status'] != 'success':
+                                report('failed')
+                                yield {"building_id": result['building_id'], "stage": "generate", "status": "failed", "error": result['error']}
+                                continue
+                            report('generated')
+                            simulation_args = (result['idf_path'], epwfile, idd_path, output_options)
+                            futures[simulation_pool.submit(run_simulation, simulation_args)] = ('simulate', result['building_id'])
+                            simulating += 1
+                            metrics.SIMULATIONS_IN_FLIGHT.inc()
+
+                    elif stage == 'simulate':
+                        simulating -= 1
+                        metrics.SIMULATIONS_IN_FLIGHT.dec()
+                        building_id = payload
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+                        record_result('simulate', building_id, result)
+                        if result['status'] != 'success':
+                            report('failed')
+                            yield {"building_id": building_id, "stage": "simulate", "status": "failed", "error": result['error']}
+                            continue
+                        report('simulated')
+                        simulation_totals['runs'] += 1
+                        simulation_totals['seconds'] += result.get('seconds') or 0.0
+                        simulation_totals['output_bytes'] += result.get('output_bytes') or 0
+                        futures[postprocess_pool.submit(_postprocess, result, building_id, building_info.get(building_id, {}), run_time_intervals, config_manager.reporting_frequency)] = ('postprocess', building_id)
+
+                    else:
+                        building_id = payload
+                        try:
+                            time_intervals, record, spans = future.result()
+                        except Exception as e:
+                            record_result('postprocess', building_id, {"status": "failed"})
+                            report('failed')
+                            yield {"building_id": building_id, "stage": "postprocess", "status": "failed", "error": f"{type(e).__name__}: {e}"}
+                            continue
+                        record_result('postprocess', building_id, {"status": "success", "spans": spans})
+                        report('postprocessed')
+                        yield {"building_id": building_id, "stage": "postprocess", "status": "success", "error": None,
+                               "time_intervals": time_intervals, "record": record}
+
+                refill()
+        finally:
+            # Leave no stale gauges behind when the run ends or its consumer stops early
+            metrics.SIMULATIONS_IN_FLIGHT.dec(simulating)
+            for role, pid in worker_labels:
+                metrics.WORKER_RSS.remove(role=role, pid=pid)
+
+    if simulation_totals['runs']:
+        print(f"Output profile {config_manager.output_profile}: {simulation_totals['runs']} simulations wrote "
+              f"{simulation_totals['output_bytes'] / 1024 ** 2:.1f} MB in {simulation_totals['seconds']:.1f} s")
+
+
+def run_pipeline(merged_df, buildings_df, output_dir, base_idf_path, idd_path, epwfile, config_manager, **options):
+    """
+    Runs the streaming pipeline to completion and writes the JSON result; returns (json_path, results).
+
+    Building series go straight into a ResultStore under output_dir/results as they arrive, so
+    memory use does not grow with the number of buildings.
+    """
+    results = []
+    # Without a recorder from the caller, spans are still collected (and then discarded)
+    timings = options.setdefault('timings', TimingRecorder())
+
+    with ResultStore(os.path.join(output_dir, "results")) as store:
+        for result in iter_pipeline(merged_df, buildings_df, output_dir, base_idf_path, idd_path, epwfile, config_manager, **options):
+            if result['status'] == 'success':
+                try:
+                    with timings.span("store_append", result['building_id']):
+                        store.append(result.pop('time_intervals'), result.pop('record'))
+                except ValueError as e:
+                    result.update(stage="store", status="failed", error=str(e))
+                    metrics.BUILDING_FAILURES.inc(stage="store")
+            if result['status'] != 'success':
+                print(f"Building {result['building_id']} failed during {result['stage']}: {result['error']}")
+            results.append(result)
+
+    with timings.span("write_energy_json"):
+        json_file_path = write_energy_json(output_dir, store.store_dir)
+    return json_file_path, results
+
+
+def iter_pipeline_json(merged_df, buildings_df, output_dir, base_idf_path, idd_path, epwfile, config_manager, **options):
+    """
+    Runs the streaming pipeline and yields the energy JSON document in pieces as buildings finish.
+
+    The document is opened before the first building is done, so the connection is never idle
+    while the first buildings run. Each successful building follows as one compact object;
+    failed buildings are logged and left out, as in run_pipeline. timeIntervals comes after the
+    buildings list. If the pipeline itself fails, the document is still closed, with an "error"
+    field holding the error, so the client can tell a cut-off result from a complete one.
+    """
+    yield '{"buildings": ['
+    started = False
+    time_intervals = []
+    error = None
+    try:
+        for result in iter_pipeline(merged_df, buildings_df, output_dir, base_idf_path, idd_path, epwfile, config_manager, **options):
+            if result['status'] != 'success':
+                print(f"Building {result['building_id']} failed during {result['stage']}: {result['error']}")
+                continue
+            building = json.dumps(result['record'], default=str)
+            if not started:
+                started = True
+                time_intervals = result['time_intervals']
+                yield building
+            else:
+                yield ", " + building
+    except Exception as e:
+        traceback.print_exc()
+        error = str(e)
+
+    closing = '], "timeIntervals": ' + json.dumps(time_intervals)
+    if error is not None:
+        closing += ', "error": ' + json.dumps(error)
+    yield closing + "}"
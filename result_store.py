@@ -0,0 +1,124 @@
+# result_store.py
+import json
+import os
+
+import numpy as np
+
+# Timestep series stored for every building, in the order they appear in the JSON output
+SERIES = ("Natural Gas Consumption (J)", "Electricity Consumption (J)", "Total Energy (J)")
+SERIES_FILES = {
+    "Natural Gas Consumption (J)": "natural_gas.f64",
+    "Electricity Consumption (J)": "electricity.f64",
+    "Total Energy (J)": "total_energy.f64",
+}
+DTYPE = "<f8"
+FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+INDEX_FILE = "buildings.jsonl"
+
+
+class ResultStore:
+    """
+    Append-only columnar store for per-building timestep results.
+
+    Each series is one raw little-endian float64 file holding a (buildings x timesteps) matrix,
+    written one building row at a time, with a JSON-lines index of building ids and info next to
+    it. Nothing is kept in memory between appends, so memory use does not grow with the batch.
+    close() writes the manifest that makes the store readable with open_result_store().
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        os.makedirs(store_dir, exist_ok=True)
+        self.time_intervals = None
+        self.n_buildings = 0
+        self._series_files = {name: open(os.path.join(store_dir, SERIES_FILES[name]), "wb") for name in SERIES}
+        self._index_file = open(os.path.join(store_dir, INDEX_FILE), "w")
+
+    def append(self, time_intervals, record):
+        """Appends one building record as produced by json_processor.read_building_output."""
+        if self.time_intervals is None:
+            self.time_intervals = list(time_intervals)
+        n_steps = len(self.time_intervals)
+
+        # Validate every series before writing any, so a bad record never misaligns the files
+        columns = {name: np.asarray(record[name], dtype=DTYPE) for name in SERIES}
+        for name, values in columns.items():
+            if len(values) != n_steps:
+                raise ValueError(f"Building {record['buildingId']} has {len(values)} values for {name}, expected {n_steps}")
+        for name, values in columns.items():
+            values.tofile(self._series_files[name])
+
+        entry = {"buildingId": record["buildingId"], "row": self.n_buildings, "building_info": record.get("building_info", {})}
+        self._index_file.write(json.dumps(entry, default=str) + "\n")
+        self.n_buildings += 1
+
+    def close(self):
+        """Flushes the data files and writes the manifest; returns the store directory."""
+        for f in self._series_files.values():
+            f.close()
+        self._index_file.close()
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "dtype": DTYPE,
+            "n_buildings": self.n_buildings,
+            "n_steps": len(self.time_intervals or []),
+            "series": SERIES_FILES,
+            "index": INDEX_FILE,
+            "time_intervals": self.time_intervals or [],
+        }
+        tmp_path = os.path.join(self.store_dir, MANIFEST_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(self.store_dir, MANIFEST_FILE))
+        return self.store_dir
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+
+class ResultStoreReader:
+    """Read access to a closed ResultStore; series are memory-mapped, not loaded."""
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Result store {store_dir} has format version {self.manifest.get('format_version')}, expected {FORMAT_VERSION}")
+        self.time_intervals = self.manifest["time_intervals"]
+        self.n_buildings = self.manifest["n_buildings"]
+        self.n_steps = self.manifest["n_steps"]
+
+    def series(self, name):
+        """Returns the (buildings x timesteps) matrix of one series as a read-only memmap."""
+        shape = (self.n_buildings, self.n_steps)
+        if not self.n_buildings or not self.n_steps:
+            return np.empty(shape, dtype=DTYPE)
+        return np.memmap(os.path.join(self.store_dir, self.manifest["series"][name]), dtype=self.manifest["dtype"], mode="r", shape=shape)
+
+    def iter_index(self):
+        """Yields the index entry (buildingId, row, building_info) of every stored building."""
+        with open(os.path.join(self.store_dir, self.manifest["index"])) as f:
+            for line in f:
+                yield json.loads(line)
+
+    def iter_records(self):
+        """Yields one JSON-ready building record at a time, in the layout of the energy JSON."""
+        matrices = {name: self.series(name) for name in SERIES}
+        for entry in self.iter_index():
+            row = entry["row"]
+            record = {"buildingId": entry["buildingId"]}
+            for name in SERIES:
+                record[name] = matrices[name][row].tolist()
+            record["building_info"] = entry["building_info"]
+            yield record
+
+
+def open_result_store(store_dir):
+    return ResultStoreReader(store_dir)
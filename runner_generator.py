@@ -2,10 +2,21 @@ import os
 import pandas as pd
 from eppy.modeleditor import IDF
 from multiprocessing import Pool
-from config import get_idf_config  # Import configuration function
+from config import get_idf_config, get_simulation_config, get_simulation_cache_config  # Import configuration function
+from simulation_cache import SimulationCache, output_files, simulation_key
+from output_profiles import DEFAULT_OUTPUT_PROFILE, apply_output_profile
+from metrics import current_rss_bytes
+from timing import SpanTimer
+import fake_energyplus
 import logging
+import time
 
-def modify_idf_for_detailed_output(idf):
+def add_result_output(idf, result_source="sqlite"):
+    # Results are read straight from the SQLite output unless the CSV source is configured
+    if result_source == "sqlite" and not idf.idfobjects['OUTPUT:SQLITE']:
+        idf.newidfobject('OUTPUT:SQLITE', Option_Type='Simple')
+
+def modify_idf_for_detailed_output(idf, reporting_frequency="timestep"):
     variables = [
         "Facility Total Electric Demand Power",
         "Facility Total Gas Demand Power",
@@ -16,50 +27,121 @@ def modify_idf_for_detailed_output(idf):
             'OUTPUT:VARIABLE',
             Key_Value='*',
             Variable_Name=variable,
-            Reporting_Frequency='timestep'
+            Reporting_Frequency=reporting_frequency
         )
 
-def make_eplaunch_options(idf, fname):
+def make_eplaunch_options(idf, fname, result_source="sqlite"):
     filename_without_extension = os.path.splitext(os.path.basename(fname))[0]
     return {
         'output_prefix': filename_without_extension,
         'output_suffix': 'C',
         'output_directory': os.path.dirname(fname),
-        'readvars': True,
+        # ReadVarsESO is only needed to produce the CSV
+        'readvars': result_source == "csv",
         'expandobjects': True,
     }
 
+def simulation_output_path(idf_path, result_source="sqlite"):
+    """Path of the output run_simulation reads results from: the SQLite database or the ReadVarsESO CSV."""
+    extension = '.sql' if result_source == "sqlite" else '.csv'
+    return os.path.splitext(idf_path)[0] + extension
+
+def simulation_output_bytes(options):
+    """Total size of the files EnergyPlus wrote for one run."""
+    output_dir, prefix = options['output_directory'], options['output_prefix']
+    return sum(os.path.getsize(os.path.join(output_dir, name)) for name in output_files(output_dir, prefix))
+
+def run_energyplus(idf, idf_path, epwfile, options):
+    # EnergyPlus itself, including the ReadVarsESO pass when the CSV result source is used
+    idf.run(**options)
+
+# Simulator backends: each writes the outputs of one run for options['output_prefix'] into
+# options['output_directory'], and is selected with SIMULATOR
+SIMULATORS = {
+    "energyplus": run_energyplus,
+    "fake": fake_energyplus.run,
+}
+
+def get_simulator(name):
+    if name not in SIMULATORS:
+        raise ValueError(f"Unknown simulator {name!r}; expected one of {', '.join(SIMULATORS)}")
+    return SIMULATORS[name]
+
+def simulator_version(name, energyplus_version):
+    """Version that goes into the simulation cache key, so outputs of different backends never mix."""
+    return energyplus_version if name == "energyplus" else f"{fake_energyplus.FAKE_VERSION}:{energyplus_version}"
+
 def run_simulation(args):
-    idf_path, epwfile, iddfile = args
+    # args is (idf_path, epwfile, iddfile) with an optional dict of output options
+    # (reporting_frequency, output_profile) as fourth item
+    idf_path, epwfile, iddfile = args[:3]
+    output_options = args[3] if len(args) > 3 else {}
+    reporting_frequency = output_options.get('reporting_frequency', "timestep")
+    output_profile = output_options.get('output_profile', DEFAULT_OUTPUT_PROFILE)
+    timer = SpanTimer()
     ###
     ###
     try:
-        IDF.setiddname(iddfile)
-        idf = IDF(idf_path, epwfile)
-        modify_idf_for_detailed_output(idf)
-        options = make_eplaunch_options(idf, idf_path)
-        ####
-        
-        idf.run(**options)
+        with timer.span("simulation_setup"):
+            simulation_config = get_simulation_config()
+            simulate = get_simulator(simulation_config['simulator'])
+            IDF.setiddname(iddfile)
+            idf = IDF(idf_path, epwfile)
+            result_source = simulation_config['result_source']
+            add_result_output(idf, result_source)
+            if output_profile == DEFAULT_OUTPUT_PROFILE:
+                modify_idf_for_detailed_output(idf, reporting_frequency)
+            else:
+                # Request only what the profile's consumer reads
+                apply_output_profile(idf, output_profile, reporting_frequency)
+            options = make_eplaunch_options(idf, idf_path, result_source)
+        start = time.perf_counter()
+
+        # Reuse the outputs of an identical earlier simulation when there is one
+        cache_config = get_simulation_cache_config()
+        cache = SimulationCache() if cache_config['enabled'] else None
+        if cache:
+            with timer.span("cache_lookup"):
+                key = simulation_key(idf.idfstr(), epwfile, simulator_version(simulation_config['simulator'], cache_config['energyplus_version']))
+                cache_hit = cache.fetch(key, options['output_directory'], options['output_prefix'])
+            if cache_hit:
+                logging.info(f"Simulation cache hit for {idf_path}")
+                return {"idf_path": idf_path, "status": "success", "output_path": simulation_output_path(idf_path, result_source), "error": None, "cache_hit": True,
+                        "seconds": time.perf_counter() - start, "output_bytes": simulation_output_bytes(options), "spans": timer.spans,
+                        "pid": os.getpid(), "rss_bytes": current_rss_bytes()}
+
+        # Kept as the "energyplus" stage for every backend, so its time separates from the overhead around it
+        timer.call(simulate, idf, idf_path, epwfile, options, stage="energyplus")
+        seconds = time.perf_counter() - start
         logging.info(f"Simulation completed for {idf_path}")
+        if cache:
+            timer.call(cache.store, key, options['output_directory'], options['output_prefix'], stage="cache_store")
+        return {"idf_path": idf_path, "status": "success", "output_path": simulation_output_path(idf_path, result_source), "error": None, "cache_hit": False,
+                "seconds": seconds, "output_bytes": simulation_output_bytes(options), "spans": timer.spans,
+                "pid": os.getpid(), "rss_bytes": current_rss_bytes()}
     except Exception as e:
         logging.error(f"Error during simulation for {idf_path}: {e}", exc_info=True)
+        return {"idf_path": idf_path, "status": "failed", "output_path": None, "error": f"{type(e).__name__}: {e}", "cache_hit": False,
+                "seconds": None, "output_bytes": None, "spans": timer.spans,
+                "pid": os.getpid(), "rss_bytes": current_rss_bytes()}
 
-def generate_simulations(idf_directory, epwfile, iddfile):
+def generate_simulations(idf_directory, epwfile, iddfile, output_options=None):
     for filename in os.listdir(idf_directory):
         if filename.endswith(".idf"):
             idf_path = os.path.join(idf_directory, filename)
-            yield (idf_path, epwfile, iddfile)
+            yield (idf_path, epwfile, iddfile, output_options or {})
 
-def simulate_all():
+def simulate_all(idf_directory=None, epwfile=None, iddfile=None, output_options=None):
+    # Simulates every IDF in idf_directory, which should be the run's own workspace
+    # output_options (reporting_frequency, output_profile) apply to every run
     config = get_idf_config()  # Use configuration settings
-    idf_directory = config['output_dir']
-    epwfile = config['epwfile']
-    iddfile = config['iddfile']
-    num_workers = 4  
+    idf_directory = idf_directory or config['output_dir']
+    epwfile = epwfile or config['epwfile']
+    iddfile = iddfile or config['iddfile']
+    num_workers = get_simulation_config()['num_workers']
 
     with Pool(num_workers) as pool:
-        pool.map(run_simulation, generate_simulations(idf_directory, epwfile, iddfile))
+        return pool.map(run_simulation, generate_simulations(idf_directory, epwfile, iddfile, output_options))
 
 if __name__ == '__main__':
     simulate_all()
@@ -0,0 +1,186 @@
+# simulation_cache.py
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import closing, contextmanager
+
+from config import get_simulation_cache_config
+
+# Outputs are stored under this neutral prefix and renamed to the building's prefix on a hit
+CACHED_PREFIX = "cached"
+
+CREATE_TABLES = (
+    """CREATE TABLE IF NOT EXISTS entries (
+        key TEXT PRIMARY KEY,
+        size_bytes INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        last_access REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0
+    )""",
+    """CREATE TABLE IF NOT EXISTS counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )""",
+)
+
+_epw_digests = {}
+
+
+def normalize_idf_text(idf_text):
+    """Strips comments and formatting so that equivalent IDFs hash to the same key."""
+    tokens = []
+    for line in idf_text.splitlines():
+        line = line.split('!', 1)[0].strip()
+        if line:
+            tokens.extend(token.strip() for token in re.split(r'([,;])', line) if token.strip())
+    return ''.join(tokens)
+
+
+def file_digest(path):
+    """SHA-256 of a file, remembered per (path, size, mtime) since the EPW is shared by every building."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime)
+    digest = _epw_digests.get(memo_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        _epw_digests[memo_key] = digest
+    return digest
+
+
+def simulation_key(idf_text, epwfile, energyplus_version):
+    """Content address of a simulation: normalized IDF text, EPW contents and EnergyPlus version."""
+    sha = hashlib.sha256()
+    sha.update(normalize_idf_text(idf_text).encode('utf-8'))
+    sha.update(b'\0')
+    sha.update(file_digest(epwfile).encode('ascii'))
+    sha.update(b'\0')
+    sha.update(str(energyplus_version).encode('utf-8'))
+    return sha.hexdigest()
+
+
+def output_files(output_dir, prefix):
+    """Files EnergyPlus wrote for prefix, excluding the input IDF and other buildings' files."""
+    # The lookahead keeps modified_building_1 from matching modified_building_12.csv
+    pattern = re.compile(rf"^{re.escape(prefix)}(?![0-9])")
+    return [
+        name for name in os.listdir(output_dir)
+        if pattern.match(name) and not name.endswith('.idf') and os.path.isfile(os.path.join(output_dir, name))
+    ]
+
+
+class SimulationCache:
+    """
+    On-disk cache of EnergyPlus outputs with size-based LRU eviction.
+
+    Entries live in <cache_dir>/<key[:2]>/<key>/ and are tracked, together with the hit and miss
+    counters, in a SQLite index so that all simulation worker processes share one cache.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        cache_config = get_simulation_cache_config()
+        self.cache_dir = cache_dir or cache_config['cache_dir']
+        self.max_bytes = max_bytes if max_bytes is not None else cache_config['max_bytes']
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index_path = os.path.join(self.cache_dir, "index.sqlite3")
+        with self._connect() as conn:
+            for statement in CREATE_TABLES:
+                conn.execute(statement)
+
+    @contextmanager
+    def _connect(self):
+        # sqlite3's own context manager only commits; closing() also releases the connection
+        with closing(sqlite3.connect(self.index_path, timeout=60)) as conn:
+            yield conn
+            conn.commit()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _count(self, conn, name):
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+
+    def fetch(self, key, output_dir, prefix):
+        """Copies a cached result into output_dir under prefix; returns True on a hit."""
+        entry_dir = self._entry_dir(key)
+        with self._connect() as conn:
+            found = conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+            if not found or not os.path.isdir(entry_dir):
+                self._count(conn, 'misses')
+                return False
+            conn.execute("UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+            self._count(conn, 'hits')
+
+        for name in os.listdir(entry_dir):
+            shutil.copyfile(os.path.join(entry_dir, name), os.path.join(output_dir, prefix + name[len(CACHED_PREFIX):]))
+        return True
+
+    def store(self, key, output_dir, prefix):
+        """Adds the outputs written for prefix to the cache, then evicts down to max_bytes."""
+        entry_dir = self._entry_dir(key)
+        if os.path.isdir(entry_dir):
+            return
+        os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+
+        # Copy into a private directory first so other workers never see a half-written entry
+        staging_dir = tempfile.mkdtemp(dir=os.path.dirname(entry_dir))
+        size = 0
+        for name in output_files(output_dir, prefix):
+            target = os.path.join(staging_dir, CACHED_PREFIX + name[len(prefix):])
+            shutil.copyfile(os.path.join(output_dir, name), target)
+            size += os.path.getsize(target)
+        try:
+            os.rename(staging_dir, entry_dir)
+        except OSError:
+            # Another worker stored the same simulation first
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, size_bytes, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, size, now, now)
+            )
+        self.evict()
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        with self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for key, size in conn.execute("SELECT key, size_bytes FROM entries ORDER BY last_access").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+                self._count(conn, 'evictions')
+                total -= size
+
+    def stats(self):
+        """Hit/miss/eviction counters plus the current number of entries and their total size."""
+        with self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()
+        hits = counters.get('hits', 0)
+        misses = counters.get('misses', 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get('evictions', 0),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,126 @@
+# sql_reader.py
+import calendar
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+
+# Reporting frequencies as EnergyPlus writes them to ReportDataDictionary.ReportingFrequency
+SQL_FREQUENCIES = {
+    "timestep": ("Zone Timestep", "HVAC System Timestep"),
+    "hourly": ("Hourly",),
+    "daily": ("Daily",),
+    "monthly": ("Monthly",),
+}
+
+# EnvironmentPeriods.EnvironmentType of the weather-file run period (1 and 2 are design days)
+RUN_PERIOD_ENVIRONMENT = 3
+
+# (key, name) of the series the energy JSON is built from; meters have an empty key
+ELECTRICITY_SERIES = ("", "Electricity:Facility")
+GAS_SERIES = [
+    ("SHWSYS1_WATER_HEATER", "Water Heater Heating Energy"),
+    ("CENTRAL BOILER", "Boiler Heating Energy"),
+]
+
+DICTIONARY_QUERY = """
+    SELECT ReportDataDictionaryIndex, UPPER(COALESCE(KeyValue, '')), Name
+    FROM ReportDataDictionary
+    WHERE Name IN ({names}) AND ReportingFrequency IN ({frequencies})
+"""
+
+DATA_QUERY = """
+    SELECT r.ReportDataDictionaryIndex, r.TimeIndex, r.Value
+    FROM ReportData r
+    JOIN Time t ON t.TimeIndex = r.TimeIndex
+    JOIN EnvironmentPeriods e ON e.EnvironmentPeriodIndex = t.EnvironmentPeriodIndex
+    WHERE r.ReportDataDictionaryIndex IN ({indexes})
+      AND e.EnvironmentType = ?
+      AND COALESCE(t.WarmupFlag, 0) = 0
+    ORDER BY r.TimeIndex
+"""
+
+TIME_QUERY = """
+    SELECT TimeIndex, Month, Day, Hour, Minute FROM Time WHERE TimeIndex BETWEEN ? AND ? ORDER BY TimeIndex
+"""
+
+
+def format_time_label(month, day, hour, minute, reporting_frequency="timestep"):
+    """Date/Time label in the format ReadVarsESO writes to the CSV for this reporting frequency."""
+    if reporting_frequency == "monthly":
+        return calendar.month_name[month]
+    if reporting_frequency == "daily":
+        return f" {month:02d}/{day:02d}"
+    return f" {month:02d}/{day:02d}  {hour:02d}:{minute:02d}:00"
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+def connect(sql_path):
+    """Opens an EnergyPlus SQLite output read-only, so a missing file is an error instead of a new database."""
+    return closing(sqlite3.connect(f"file:{sql_path}?mode=ro", uri=True))
+
+
+def read_series(conn, series, reporting_frequency="timestep"):
+    """
+    Reads the run-period values of the given (key, name) series from an open EnergyPlus SQLite output.
+
+    Only the dictionary entries and rows for these series are queried. Returns
+    (time_indexes, {(key, name): float64 array aligned to time_indexes}); series that are not
+    in the database are left out.
+    """
+    names = sorted({name for _, name in series})
+    frequencies = SQL_FREQUENCIES[reporting_frequency]
+    wanted = {(key.upper(), name) for key, name in series}
+
+    dictionary = conn.execute(
+        DICTIONARY_QUERY.format(names=_placeholders(names), frequencies=_placeholders(frequencies)),
+        names + list(frequencies),
+    ).fetchall()
+    index_to_series = {index: (key, name) for index, key, name in dictionary if (key, name) in wanted}
+    if not index_to_series:
+        return np.empty(0, dtype=np.int64), {}
+
+    indexes = list(index_to_series)
+    rows = conn.execute(DATA_QUERY.format(indexes=_placeholders(indexes)), indexes + [RUN_PERIOD_ENVIRONMENT]).fetchall()
+
+    data = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    time_indexes = np.unique(data[:, 1]).astype(np.int64)
+    values = {}
+    for index, series_key in index_to_series.items():
+        selected = data[data[:, 0] == index]
+        column = np.zeros(len(time_indexes))
+        column[np.searchsorted(time_indexes, selected[:, 1].astype(np.int64))] = selected[:, 2]
+        values[series_key] = column
+    return time_indexes, values
+
+
+def read_time_labels(conn, time_indexes, reporting_frequency="timestep"):
+    """Date/Time labels for the given Time table indexes, formatted like the CSV."""
+    if not len(time_indexes):
+        return []
+    # A range scan instead of an IN list, which would exceed SQLite's parameter limit for a year of timesteps
+    wanted = set(time_indexes.tolist())
+    rows = conn.execute(TIME_QUERY, (int(time_indexes[0]), int(time_indexes[-1]))).fetchall()
+    return [format_time_label(month, day, hour, minute, reporting_frequency)
+            for index, month, day, hour, minute in rows if index in wanted]
+
+
+def read_energy_series(sql_path, include_time=True, reporting_frequency="timestep"):
+    """
+    Returns (time_labels or None, electricity, natural_gas) arrays for one building's SQLite output,
+    or None when it has no electricity meter. Natural gas is the water heater plus boiler energy.
+    """
+    with connect(sql_path) as conn:
+        time_indexes, values = read_series(conn, [ELECTRICITY_SERIES] + GAS_SERIES, reporting_frequency)
+        if ELECTRICITY_SERIES not in values:
+            return None
+        time_labels = read_time_labels(conn, time_indexes, reporting_frequency) if include_time else None
+
+    electricity = values[ELECTRICITY_SERIES]
+    natural_gas = np.zeros(len(time_indexes))
+    for gas_key, name in GAS_SERIES:
+        natural_gas += values.get((gas_key.upper(), name), 0)
+    return time_labels, electricity, natural_gas
@@ -0,0 +1,129 @@
+# timing.py
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+
+TIMINGS_FILE = "timings.jsonl"
+TIMING_REPORT_FILE = "timing_report.json"
+
+
+class SpanTimer:
+    """
+    Collects timing spans for one unit of work, e.g. one building in a worker process.
+    Spans are plain dicts ({"stage": ..., "seconds": ...}) so they travel back in result dicts.
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append({"stage": stage, "seconds": time.perf_counter() - start})
+
+    def call(self, func, *args, stage=None, **kwargs):
+        """Calls func, recording its duration under stage (default: the function's name)."""
+        with self.span(stage or func.__name__):
+            return func(*args, **kwargs)
+
+
+class TimingRecorder:
+    """
+    Per-run collection of timing spans.
+
+    Every span is appended to a JSONL file (one {"building_id", "stage", "seconds"} line each) once
+    open() has been given the run's workspace; spans recorded before that are written then.
+    summary() aggregates count, total, p50, p95 and max seconds per stage.
+    """
+
+    def __init__(self):
+        self.durations = defaultdict(list)
+        self.workspace_dir = None
+        self._pending = []
+        self._file = None
+
+    def open(self, workspace_dir):
+        self.workspace_dir = workspace_dir
+        self._file = open(os.path.join(workspace_dir, TIMINGS_FILE), "a")
+        for line in self._pending:
+            self._file.write(line)
+        self._pending = []
+
+    def add(self, building_id, spans):
+        for span in spans:
+            self.durations[span['stage']].append(span['seconds'])
+            line = json.dumps({"building_id": building_id, "stage": span['stage'], "seconds": round(span['seconds'], 6)}) + "\n"
+            if self._file:
+                self._file.write(line)
+            else:
+                self._pending.append(line)
+        if self._file:
+            # Flushed per call so load_timing_report can summarize a run that is still going
+            self._file.flush()
+
+    @contextmanager
+    def span(self, stage, building_id=None):
+        """Times a run-level stage (database query, preprocessing, JSON writing, ...)."""
+        timer = SpanTimer()
+        try:
+            with timer.span(stage):
+                yield
+        finally:
+            self.add(building_id, timer.spans)
+
+    def summary(self):
+        report = {}
+        for stage, durations in self.durations.items():
+            values = np.asarray(durations)
+            report[stage] = {
+                "count": len(values),
+                "total": round(float(values.sum()), 6),
+                "p50": round(float(np.percentile(values, 50)), 6),
+                "p95": round(float(np.percentile(values, 95)), 6),
+                "max": round(float(values.max()), 6),
+            }
+        return report
+
+    def close(self):
+        """Closes the JSONL file and writes the summary next to it; returns the summary."""
+        report = self.summary()
+        if self._file:
+            self._file.close()
+            self._file = None
+            with open(os.path.join(self.workspace_dir, TIMING_REPORT_FILE), "w") as f:
+                json.dump(report, f, indent=4)
+        return report
+
+
+def load_timing_report(workspace_dir):
+    """
+    The timing report of a run's workspace: the final report once the run has written it, a live
+    summary of the spans recorded so far while it is running, or None if there are none.
+    """
+    report_path = os.path.join(workspace_dir, TIMING_REPORT_FILE)
+    if os.path.exists(report_path):
+        with open(report_path) as f:
+            return json.load(f)
+    timings_path = os.path.join(workspace_dir, TIMINGS_FILE)
+    if not os.path.exists(timings_path):
+        return None
+    recorder = TimingRecorder()
+    with open(timings_path) as f:
+        for line in f:
+            if line.endswith("\n"):  # skip a line that is still being written
+                span = json.loads(line)
+                recorder.durations[span['stage']].append(span['seconds'])
+    return recorder.summary()
+
+
+def print_timing_report(report):
+    print(f"{'stage':<52} {'count':>7} {'p50 s':>9} {'p95 s':>9} {'max s':>9} {'total s':>10}")
+    for stage, stats in sorted(report.items(), key=lambda item: -item[1]['total']):
+        print(f"{stage:<52} {stats['count']:>7} {stats['p50']:>9.3f} {stats['p95']:>9.3f} {stats['max']:>9.3f} {stats['total']:>10.1f}")
@@ -0,0 +1,71 @@
+# workspace.py
+import os
+import shutil
+import time
+import uuid
+
+from config import get_workspace_config
+
+
+def create_workspace(run_id=None, active_runs=()):
+    """
+    Creates an isolated directory for one analysis run and returns (run_id, path).
+
+    Every stage of the run reads and writes only inside this directory, so concurrent runs never
+    simulate or ingest each other's buildings. Expired workspaces are removed first, except those
+    of active_runs (the IDs of queued and running jobs).
+    """
+    workspace_config = get_workspace_config()
+    run_id = run_id or uuid.uuid4().hex
+    cleanup_expired_workspaces(workspace_config['root'], workspace_config['retention_hours'], keep=active_runs)
+
+    path = os.path.join(workspace_config['root'], run_id)
+    os.makedirs(path, exist_ok=False)
+    return run_id, path
+
+
+def _modified_since(path, cutoff):
+    """True if path or anything under it was modified after cutoff."""
+    if os.path.getmtime(path) >= cutoff:
+        return True
+    # Writing to a file or subdirectory does not touch the workspace directory's own mtime
+    for dir_path, dir_names, file_names in os.walk(path):
+        for name in dir_names + file_names:
+            try:
+                if os.path.getmtime(os.path.join(dir_path, name)) >= cutoff:
+                    return True
+            except OSError:
+                continue
+    return False
+
+
+def cleanup_expired_workspaces(root, retention_hours, keep=()):
+    """
+    Deletes workspaces under root with nothing modified in the last retention_hours, except the
+    run IDs in keep.
+    """
+    if not os.path.isdir(root):
+        return
+    cutoff = time.time() - retention_hours * 3600
+    keep = set(keep)
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if name in keep or not os.path.isdir(path) or _modified_since(path, cutoff):
+            continue
+        print(f"Removing expired workspace {path}")
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def finalize_workspace(path, keep_files):
+    """Applies the configured cleanup policy once a run has produced its result files."""
+    if get_workspace_config()['cleanup'] != "result_only":
+        return
+    keep = {os.path.abspath(p) for p in keep_files}
+    for name in os.listdir(path):
+        file_path = os.path.join(path, name)
+        if os.path.abspath(file_path) in keep:
+            continue
+        if os.path.isdir(file_path):
+            shutil.rmtree(file_path, ignore_errors=True)
+        else:
+            os.remove(file_path)